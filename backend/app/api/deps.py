@@ -1,26 +1,34 @@
 from __future__ import annotations
 
+import string
 from collections.abc import Generator
 from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, Request, status
 from sqlmodel import Session
 
+from app.core.config import get_settings
 from app.db.session import get_session as _get_session
 from app.db.models import User
 from app.schemas.auth import AuthenticatedUser
 from app.services.auth import AuthService, AuthenticationError
 from app.services.llm import OpenAIChatService
 from app.services.search_index import SearchIndexService
+from app.utils.cache import TTLCache
 
-_auth_service: AuthService | None = None
+_settings = get_settings()
+_JWT_CHARSET = frozenset(string.ascii_letters + string.digits + "-_.=")
+_MAX_TOKEN_LENGTH = 8192
+_auth_user_cache: TTLCache[UUID, AuthenticatedUser] = TTLCache(
+    maxsize=_settings.auth_user_cache_size,
+    ttl=_settings.auth_user_cache_ttl_seconds,
+)
 
 
-def get_auth_service() -> AuthService:
-    global _auth_service
-    if _auth_service is None:
-        _auth_service = AuthService()
-    return _auth_service
+# Dependencies that only read request state are coroutines so FastAPI awaits them
+# inline instead of dispatching each one to the threadpool.
+async def get_auth_service(request: Request) -> AuthService:
+    return request.app.state.auth_service
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -39,14 +47,32 @@ def _extract_bearer_token(authorization: str | None) -> str:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authorization scheme",
         )
-    return token.strip()
+    token = token.strip()
+    if not _looks_like_jwt(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    return token
+
 
+def _looks_like_jwt(token: str) -> bool:
+    # Cheap structural check so garbage never reaches signature verification.
+    if len(token) > _MAX_TOKEN_LENGTH or token.count(".") != 2:
+        return False
+    if not _JWT_CHARSET.issuperset(token):
+        return False
+    return all(token.split("."))
 
-def get_current_user(
+
+def _authenticate(
     authorization: str | None = Header(default=None, alias="Authorization"),
     session: Session = Depends(get_session),
     auth_service: AuthService = Depends(get_auth_service),
-) -> AuthenticatedUser:
+) -> AuthenticatedUser | None:
+    """Resolve the caller once per request; ``None`` when no credentials were sent."""
+    if not authorization:
+        return None
     token = _extract_bearer_token(authorization)
     try:
         payload = auth_service.decode_access_token(token)
@@ -56,27 +82,38 @@ def get_current_user(
             detail="Could not validate credentials",
         ) from exc
 
-    try:
-        user_id = UUID(payload.sub)
-    except ValueError as exc:
+    current_user = _load_authenticated_user(session, payload.sub, payload.token_version)
+    if current_user.token_version != payload.token_version:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token subject",
-        ) from exc
+            detail="Token has been revoked",
+        )
+    return current_user
 
-    user = session.get(User, user_id)
-    if user is None or not user.is_active:
+
+async def get_current_user(
+    current_user: AuthenticatedUser | None = Depends(_authenticate),
+) -> AuthenticatedUser:
+    if current_user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Inactive or missing user",
+            detail="Missing Authorization header",
         )
-    if user.token_version != payload.token_version:
+    return current_user
+
+
+def _load_authenticated_user(session: Session, user_id: UUID, token_version: int) -> AuthenticatedUser:
+    cached = _auth_user_cache.get(user_id)
+    if cached is not None and cached.token_version == token_version:
+        return cached
+
+    user = session.get(User, user_id)
+    if user is None or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked",
+            detail="Inactive or missing user",
         )
-
-    return AuthenticatedUser(
+    snapshot = AuthenticatedUser(
         id=user.id,
         username=user.username,
         roles=tuple(user.roles or []),
@@ -84,23 +121,26 @@ def get_current_user(
         allowed_agents=frozenset(user.allowed_agents or []),
         token_version=user.token_version,
     )
+    _auth_user_cache.set(user_id, snapshot)
+    return snapshot
+
 
+def invalidate_cached_user(user_id: UUID) -> None:
+    """Drop the cached auth snapshot so the next request reloads the user row."""
+    _auth_user_cache.pop(user_id)
 
-def get_current_user_id(current_user: AuthenticatedUser = Depends(get_current_user)) -> str:
+
+async def get_current_user_id(current_user: AuthenticatedUser = Depends(get_current_user)) -> str:
     return current_user.user_id
 
 
-def get_optional_current_user(
-    authorization: str | None = Header(default=None, alias="Authorization"),
-    session: Session = Depends(get_session),
-    auth_service: AuthService = Depends(get_auth_service),
+async def get_optional_current_user(
+    current_user: AuthenticatedUser | None = Depends(_authenticate),
 ) -> AuthenticatedUser | None:
-    if not authorization:
-        return None
-    return get_current_user(authorization=authorization, session=session, auth_service=auth_service)
+    return current_user
 
 
-def get_chat_service(request: Request) -> OpenAIChatService:
+async def get_chat_service(request: Request) -> OpenAIChatService:
     service = getattr(request.app.state, "llm_service", None)
     if service is None:
         raise HTTPException(
@@ -114,7 +154,7 @@ def _get_search_service(request: Request) -> SearchIndexService | None:
     return getattr(request.app.state, "search_index_service", None)
 
 
-def get_search_index_service(request: Request) -> SearchIndexService:
+async def get_search_index_service(request: Request) -> SearchIndexService:
     service = _get_search_service(request)
     if service is None:
         raise HTTPException(
@@ -124,7 +164,7 @@ def get_search_index_service(request: Request) -> SearchIndexService:
     return service
 
 
-def get_optional_search_index_service(request: Request) -> SearchIndexService | None:
+async def get_optional_search_index_service(request: Request) -> SearchIndexService | None:
     return _get_search_service(request)
 
 
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import mimetypes
+import os
+import stat
+from email.utils import formatdate
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from fastapi.responses import FileResponse
 
 from app.api.deps import get_current_user
@@ -12,25 +18,68 @@ from app.schemas.auth import AuthenticatedUser
 router = APIRouter(prefix="/attachments", tags=["attachments"])
 
 
-def _resolve_storage_path(filename: str) -> Path:
+@lru_cache(maxsize=1)
+def _attachments_base_dir() -> Path:
     settings = get_settings()
-    base_dir = Path(settings.attachments_storage_dir).expanduser()
-    base_resolved = base_dir.resolve()
+    return Path(settings.attachments_storage_dir).expanduser().resolve(strict=False)
+
+
+def _resolve_storage_path(filename: str) -> Path:
+    base_resolved = _attachments_base_dir()
     clean_name = Path(filename).name
-    if clean_name != filename:
+    if clean_name != filename or clean_name in {"", ".", ".."}:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid attachment name")
     target = (base_resolved / clean_name).resolve()
-    if not str(target).startswith(str(base_resolved)):
+    if not target.is_relative_to(base_resolved):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid attachment path")
     return target
 
 
+def _build_file_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _content_disposition(filename: str) -> str:
+    # Same form FileResponse emits: non-ASCII names need RFC 5987 encoding.
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
 @router.get("/{attachment_name}", response_class=FileResponse)
 def download_attachment(
     attachment_name: str,
+    if_none_match: str | None = Header(default=None),
     _: AuthenticatedUser = Depends(get_current_user),
-) -> FileResponse:
+) -> Response:
     file_path = _resolve_storage_path(attachment_name)
-    if not file_path.exists():
+    try:
+        stat_result = file_path.stat()
+    except OSError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attachment not found")
-    return FileResponse(file_path, filename=file_path.name)
+
+    etag = _build_file_etag(stat_result)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    accel_prefix = get_settings().attachments_accel_redirect_prefix
+    if accel_prefix:
+        # Let the fronting nginx stream the file straight from disk (sendfile).
+        headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{quote(file_path.name)}"
+        headers["Content-Disposition"] = _content_disposition(file_path.name)
+        media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        return Response(status_code=status.HTTP_200_OK, headers=headers, media_type=media_type)
+
+    return FileResponse(file_path, filename=file_path.name, stat_result=stat_result, headers=headers)
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-from uuid import UUID
-
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlmodel import Session, select, func
+from sqlalchemy import exists, false
+from sqlmodel import Session, select
 
 from app.api.deps import (
     get_auth_service,
     get_current_user,
     get_optional_current_user,
     get_session,
+    invalidate_cached_user,
 )
 from app.db.models import User, utcnow
 from app.schemas.auth import AuthenticatedUser, LoginRequest, RefreshRequest, TokenResponse
@@ -66,15 +66,7 @@ def refresh_tokens(
             detail="Invalid refresh token",
         ) from exc
 
-    try:
-        user_id = UUID(refresh_payload.sub)
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-        ) from exc
-
-    user = session.get(User, user_id)
+    user = session.get(User, refresh_payload.sub)
     if user is None or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -114,6 +106,7 @@ def logout(
     user.updated_at = utcnow()
     session.add(user)
     session.commit()
+    invalidate_cached_user(user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -139,27 +132,30 @@ def register_user(
     current_user: AuthenticatedUser | None = Depends(get_optional_current_user),
 ) -> UserRead:
     #Temporary solution!
-    #total_users = session.exec(select(func.count()).select_from(User)).one()
-    #if total_users > 0:
+    #users_exist = session.exec(select(exists().select_from(User))).one()
+    #if users_exist:
     #    if current_user is None or not current_user.has_role("admin"):
     #        raise HTTPException(
     #            status_code=status.HTTP_403_FORBIDDEN,
     #            detail="Administrator privileges required to create users",
     #        )
 
-    username_exists = session.exec(select(User).where(User.username == payload.username)).one_or_none()
-    if username_exists is not None:
+    username_exists, email_exists = session.exec(
+        select(
+            exists().where(User.username == payload.username),
+            exists().where(User.email == payload.email) if payload.email else false(),
+        )
+    ).one()
+    if username_exists:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Username already exists",
         )
-    if payload.email:
-        email_exists = session.exec(select(User).where(User.email == payload.email)).one_or_none()
-        if email_exists is not None:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Email already exists",
-            )
+    if email_exists:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email already exists",
+        )
 
     try:
         password_hash = auth_service.hash_password(payload.password)
@@ -182,6 +178,8 @@ def register_user(
         updated_at=utcnow(),
     )
     session.add(user)
+    # Every column is populated in Python; serialise before commit expires the
+    # instance so we don't pay a SELECT to reload the row we just wrote.
+    user_read = UserRead.model_validate(user)
     session.commit()
-    session.refresh(user)
-    return UserRead.model_validate(user)
+    return user_read
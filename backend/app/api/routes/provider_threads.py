@@ -3,6 +3,7 @@ from __future__ import annotations
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import exists
 from sqlmodel import Session, select
 
 from app.api.deps import get_current_user, get_session
@@ -13,12 +14,23 @@ from app.schemas.provider_state import ProviderThreadStateRead, ProviderThreadSt
 router = APIRouter(prefix="/provider-threads", tags=["provider-thread-store"])
 
 
-def _ensure_thread_owner(session: Session, thread_id: UUID, user_id: str) -> Thread:
-    stmt = select(Thread).where(Thread.id == thread_id, Thread.owner_id == user_id)
-    thread = session.exec(stmt).one_or_none()
-    if thread is None:
+def _ensure_thread_owner(session: Session, thread_id: UUID, user_id: str) -> None:
+    stmt = select(exists().where(Thread.id == thread_id, Thread.owner_id == user_id))
+    if not session.exec(stmt).one():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thread not found")
-    return thread
+
+
+def _get_owned_state(session: Session, thread_id: UUID, provider: str, user_id: str) -> ProviderThreadState | None:
+    stmt = (
+        select(ProviderThreadState)
+        .join(Thread, Thread.id == ProviderThreadState.thread_id)
+        .where(
+            ProviderThreadState.thread_id == thread_id,
+            ProviderThreadState.provider == provider,
+            Thread.owner_id == user_id,
+        )
+    )
+    return session.exec(stmt).one_or_none()
 
 
 @router.get("/{thread_id}", response_model=ProviderThreadStateRead)
@@ -28,13 +40,9 @@ def get_provider_thread_state(
     session: Session = Depends(get_session),
     current_user: AuthenticatedUser = Depends(get_current_user),
 ) -> ProviderThreadStateRead:
-    _ensure_thread_owner(session, thread_id, current_user.user_id)
-    stmt = select(ProviderThreadState).where(
-        ProviderThreadState.thread_id == thread_id,
-        ProviderThreadState.provider == provider,
-    )
-    state = session.exec(stmt).one_or_none()
+    state = _get_owned_state(session, thread_id, provider, current_user.user_id)
     if state is None:
+        _ensure_thread_owner(session, thread_id, current_user.user_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Provider thread state not found")
     return ProviderThreadStateRead.model_validate(state)
 
@@ -46,13 +54,9 @@ def upsert_provider_thread_state(
     session: Session = Depends(get_session),
     current_user: AuthenticatedUser = Depends(get_current_user),
 ) -> ProviderThreadStateRead:
-    _ensure_thread_owner(session, thread_id, current_user.user_id)
-    stmt = select(ProviderThreadState).where(
-        ProviderThreadState.thread_id == thread_id,
-        ProviderThreadState.provider == payload.provider,
-    )
-    state = session.exec(stmt).one_or_none()
+    state = _get_owned_state(session, thread_id, payload.provider, current_user.user_id)
     if state is None:
+        _ensure_thread_owner(session, thread_id, current_user.user_id)
         state = ProviderThreadState(
             thread_id=thread_id,
             provider=payload.provider,
@@ -65,6 +69,6 @@ def upsert_provider_thread_state(
         state.payload = payload.payload or {}
         state.updated_at = utcnow()
         session.add(state)
+    state_read = ProviderThreadStateRead.model_validate(state)
     session.commit()
-    session.refresh(state)
-    return ProviderThreadStateRead.model_validate(state)
+    return state_read
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import Iterable
+from functools import lru_cache
+from typing import Iterable, Sequence
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import ColumnElement, case, exists
+from sqlalchemy.exc import DBAPIError
 from sqlmodel import Session, select
 
 from app.api.deps import (
@@ -21,6 +25,19 @@ from app.utils.pagination import build_pagination, clamp_limit
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+_PATTERN_CACHE_MAX_PHRASE_LENGTH = 512
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached_pattern(phrase: str) -> re.Pattern[str]:
+    return re.compile(phrase, re.IGNORECASE)
+
+
+def _compile_pattern(phrase: str) -> re.Pattern[str]:
+    if len(phrase) > _PATTERN_CACHE_MAX_PHRASE_LENGTH:
+        return re.compile(phrase, re.IGNORECASE)
+    return _compile_cached_pattern(phrase)
+
 
 def _extract_text_sources(thread: Thread) -> Iterable[str]:
     if thread.title:
@@ -50,7 +67,7 @@ async def search_threads(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Search phrase cannot be empty")
 
     try:
-        pattern = re.compile(phrase, re.IGNORECASE)
+        pattern = _compile_pattern(phrase)
     except re.error as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid regex: {exc}") from exc
 
@@ -82,7 +99,8 @@ async def search_threads(
 
     # Fallback to regex search when no semantic results are found
     if not ordered_thread_ids:
-        ordered_thread_ids = _regex_fallback(
+        ordered_thread_ids = await asyncio.to_thread(
+            _regex_fallback,
             session=session,
             user_id=user_id,
             pattern=pattern,
@@ -104,10 +122,7 @@ async def search_threads(
             min_similarity=vector_results.min_similarity,
         )
 
-    threads_stmt = select(Thread).where(Thread.id.in_(ordered_thread_ids))
-    fetched_threads = session.exec(threads_stmt).all()
-    thread_map = {thread.id: thread for thread in fetched_threads}
-    ordered_threads = [thread_map[thread_id] for thread_id in ordered_thread_ids if thread_id in thread_map]
+    ordered_threads = await asyncio.to_thread(_fetch_ranked_threads, session, ordered_thread_ids)
 
     pagination = build_pagination(page=1, limit=limit, total=total)
     items = [
@@ -129,6 +144,15 @@ async def search_threads(
     )
 
 
+def _fetch_ranked_threads(session: Session, ordered_thread_ids: Sequence[UUID]) -> Sequence[Thread]:
+    rank = case(
+        *((Thread.id == thread_id, position) for position, thread_id in enumerate(ordered_thread_ids)),
+        else_=len(ordered_thread_ids),
+    )
+    threads_stmt = select(Thread).where(Thread.id.in_(ordered_thread_ids)).order_by(rank)
+    return session.exec(threads_stmt).all()
+
+
 def _regex_fallback(
     *,
     session: Session,
@@ -137,38 +161,67 @@ def _regex_fallback(
     model_filter: str | None,
     limit: int,
 ) -> list[UUID]:
-    thread_query = (
-        select(Thread)
-        .where(
-            Thread.owner_id == user_id,
-            Thread.is_deleted.is_(False),
-            Thread.title.is_not(None),
-            Thread.title != "",
-        )
-        .order_by(Thread.updated_at.desc())
-    )
+    thread_filters = [
+        Thread.owner_id == user_id,
+        Thread.is_deleted.is_(False),
+        Thread.title.is_not(None),
+        Thread.title != "",
+    ]
+    if model_filter:
+        thread_filters.append(Thread.attributes["model"].as_string() == model_filter)
+    thread_query = select(Thread).where(*thread_filters).order_by(Thread.updated_at.desc())
 
     threads = session.exec(thread_query).all()
     matched_ids: list[UUID] = []
+    message_matches: set[UUID] | None = None
 
     for thread in threads:
-        attributes = thread.attributes or {}
-        if model_filter and attributes.get("model") != model_filter:
-            continue
-
         if any(pattern.search(text) for text in _extract_text_sources(thread)):
             matched_ids.append(thread.id)
-            if len(matched_ids) >= limit:
-                break
-            continue
-
-        messages_stmt = select(Message.text).where(Message.thread_id == thread.id)
-        for row in session.exec(messages_stmt):
-            text = row[0] if isinstance(row, (tuple, list)) else row
-            if text and pattern.search(text):
+        else:
+            if message_matches is None:
+                message_matches = _find_threads_with_matching_messages(
+                    session=session,
+                    thread_filters=thread_filters,
+                    pattern=pattern,
+                    limit=limit,
+                )
+            if thread.id in message_matches:
                 matched_ids.append(thread.id)
-                break
         if len(matched_ids) >= limit:
             break
 
     return matched_ids[:limit]
+
+
+def _find_threads_with_matching_messages(
+    *,
+    session: Session,
+    thread_filters: Sequence[ColumnElement[bool]],
+    pattern: re.Pattern[str],
+    limit: int,
+) -> set[UUID]:
+    # Let the database run the regex over message bodies (Postgres `~`, SQLite
+    # REGEXP). Threads are walked newest first and each EXISTS stops at the first
+    # matching message; only the first `limit` hits can make the final page, so
+    # the scan ends there.
+    # SQLite drops the `flags` argument, so case-insensitivity is spelled inline;
+    # both Python `re` and Postgres honour a leading `(?i)`.
+    message_match = exists().where(
+        Message.thread_id == Thread.id,
+        Message.text.regexp_match(f"(?i){pattern.pattern}"),
+    )
+    threads_stmt = (
+        select(Thread.id)
+        .where(*thread_filters, message_match)
+        .order_by(Thread.updated_at.desc())
+        .limit(limit)
+    )
+    try:
+        return set(session.exec(threads_stmt).all())
+    except DBAPIError as exc:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Regex is not supported by the search backend",
+        ) from exc
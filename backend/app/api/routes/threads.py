@@ -1,32 +1,43 @@
 from __future__ import annotations
 
 import asyncio
-import base64
 import binascii
 import contextlib
+import hashlib
 import inspect
 import io
-import json
 import logging
-import textwrap
+import re
+import threading
+from functools import lru_cache, partial
+from datetime import datetime
 from html import escape
 import os
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Callable, Iterable, Iterator, Sequence
 from urllib.parse import quote
 from uuid import UUID
 
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream
 import markdown as md
 import markdown2
+import orjson
+import pybase64
 from markdown_pdf import MarkdownPdf, Section
 from html2docx import html2docx as html_to_docx
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import exists, insert, tuple_
+from sqlalchemy.orm import defer
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, func, select
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
+
+try:
+    from docx import Document as _DocxDocument
+except ImportError:  # pragma: no cover - python-docx normally ships with html2docx
+    _DocxDocument = None
 
 from app.api.deps import (
     ensure_agent_access,
@@ -38,8 +49,14 @@ from app.api.deps import (
 )
 from app.db.models import Message, MessageAttachment, MessageStatus, ProviderThreadState, SenderType, Thread, utcnow
 from app.core.config import get_settings
-from app.schemas.common import PaginatedResponse
-from app.schemas.message import MessageAttachmentRead, MessageCreate, MessageRead, MessageUpdate
+from app.schemas.message import (
+    MessageAttachmentCreate,
+    MessageAttachmentRead,
+    MessageCreate,
+    MessageListResponse,
+    MessageRead,
+    MessageUpdate,
+)
 from app.schemas.thread import (
     ThreadCreate,
     ThreadDetail,
@@ -47,46 +64,53 @@ from app.schemas.thread import (
     ThreadRead,
     ThreadUpdate,
 )
+from app.utils.cache import TTLCache
 from app.utils.pagination import build_pagination, clamp_limit
+from app.utils.ticker import SharedTicker
 from app.services.llm import ChatPromptMessage, LLMServiceError, OpenAIChatService
 from app.services.search_index import SearchIndexService
 from app.schemas.auth import AuthenticatedUser
 
-router = APIRouter(prefix="/threads", tags=["threads"])
+router = APIRouter(prefix="/threads", tags=["threads"], default_response_class=ORJSONResponse)
 
 _DEFAULT_PROVIDER = "openai-compatible"
-BUNDLED_FONT_PATH = (
-    Path(__file__).resolve().parent.parent / "static" / "fonts" / "DejaVuSans.ttf"
-)
+_STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+_FONTS_DIR = _STATIC_DIR / "fonts"
+_REGULAR_FONT = _FONTS_DIR / "DejaVuSans.ttf"
+_BOLD_FONT = _FONTS_DIR / "DejaVuSans-Bold.ttf"
+_ITALIC_FONT = _FONTS_DIR / "DejaVuSans-Oblique.ttf"
+_BOLD_ITALIC_FONT = _FONTS_DIR / "DejaVuSans-BoldOblique.ttf"
 _DEFAULT_THREAD_PREFIX = "Product"
 logger = logging.getLogger(__name__)
 
-_FONTS_REGISTERED = False
-
-
-def _fonts_dir() -> Path:
-    return Path(__file__).resolve().parent.parent / "static" / "fonts"
-
-
-def _discover_font_path() -> Path | None:
-    candidates: list[Path] = [
-        _fonts_dir() / "DejaVuSans.ttf",
-        _fonts_dir() / "DejaVuSans-Bold.ttf",
-        #BUNDLED_FONT_PATH,
-        #Path("C:/Windows/Fonts/arial.ttf"),
-        #Path("C:/Windows/Fonts/arialuni.ttf"),
-        #Path("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"),
-        #Path("/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf"),
-    ]
-    for path in candidates:
-        if path.exists():
-            return path
-    return None
+_FILENAME_STRIP_RE = re.compile(r"[^A-Za-z0-9_.\-]+")
+_TITLE_BRACKETS_TABLE = str.maketrans("", "", "[]")
+_EXPORT_FILENAME_TABLE = str.maketrans({"[": None, "]": None, " ": "_"})
+_SSE_DONE_FRAME = b"data: [DONE]\n\n"
+_SSE_BUFFER_SIZE = 32
+_SSE_HEARTBEAT_INTERVAL_SECONDS = 10.0
+_TERMINAL_AGENT_STATUSES = frozenset({"completed", "interrupted", "failed"})
+# Proxies (nginx in particular) buffer responses by default, which would hold
+# frames back until the buffer fills; these make every write reach the client.
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+_MARKDOWN_TOKEN_RE = re.compile(r"[`*_#|\[]")
+_PDF_STYLESHEET: str | None = None
+_MARKDOWN_CONVERTERS = threading.local()
+_WEASYPRINT_RESOURCES: tuple[Any, Any] | None = None
+_PROMPT_ATTACHMENT_CACHE_MAX_BYTES = 512 * 1024
+# One timer for every open stream instead of a timeout armed per received frame.
+_sse_heartbeats = SharedTicker(_SSE_HEARTBEAT_INTERVAL_SECONDS)
+_prompt_attachment_cache: TTLCache[UUID, dict[str, object]] = TTLCache(
+    maxsize=get_settings().prompt_attachment_cache_size,
+    ttl=get_settings().prompt_attachment_cache_ttl_seconds,
+)
 
 
 def _sanitize_export_filename(title: str | None, thread_id: UUID) -> str:
-    raw = _sanitize_title_fragment(title or "").replace(" ", "_")
-    ascii_only = "".join(ch for ch in raw if ch.isascii() and (ch.isalnum() or ch in ("_", "-", ".")))
+    # Edge whitespace the title sanitizer would strip becomes `_` here, which the
+    # final strip("._") drops, so one translate pass covers both steps.
+    raw = (title or "").translate(_EXPORT_FILENAME_TABLE)
+    ascii_only = _FILENAME_STRIP_RE.sub("", raw)
     if not ascii_only:
         ascii_only = str(thread_id)
     return ascii_only.strip("._") or str(thread_id)
@@ -99,135 +123,53 @@ def _build_content_disposition(filename_ascii: str, filename_utf8: str | None =
     return "; ".join(parts)
 
 
-def _render_markdown_export(
+def _iter_markdown_export(
     thread: Thread,
     messages: Sequence[Message],
     attachments_map: dict[UUID, list[MessageAttachment]],
-) -> str:
-    lines: list[str] = []
+) -> Iterator[str]:
+    """Yield the markdown export in pieces: the header, then one block per message."""
+    buffer = io.StringIO()
+    write = buffer.write
     title = thread.title or f"Thread {thread.id}"
-    lines.append(f"# {title}")
-    lines.append("")
-    lines.append(f"- Thread ID: {thread.id}")
-    lines.append(f"- Created at: {thread.created_at.isoformat()}")
-    lines.append(f"- Updated at: {thread.updated_at.isoformat()}")
+    write(f"# {title}\n\n")
+    write(f"- Thread ID: {thread.id}\n")
+    write(f"- Created at: {thread.created_at.isoformat()}\n")
+    write(f"- Updated at: {thread.updated_at.isoformat()}\n")
     if thread.attributes:
         for key, value in thread.attributes.items():
-            lines.append(f"- {key}: {value}")
-    lines.append("")
-    lines.append("## Messages")
-    lines.append("")
+            write(f"- {key}: {value}\n")
+    write("\n## Messages")
+    yield buffer.getvalue()
 
     for msg in messages:
+        buffer = io.StringIO()
+        write = buffer.write
         sender = msg.sender_type.value if hasattr(msg.sender_type, "value") else str(msg.sender_type)
-        lines.append(f"### {msg.created_at.isoformat()} — {sender}")
-        lines.append("")
-        text_lines = (msg.text or "").splitlines() or [""]
-        lines.extend(text_lines)
+        write(f"\n\n### {msg.created_at.isoformat()} — {sender}\n\n")
+        write("\n".join((msg.text or "").splitlines()))
 
         attachments = attachments_map.get(msg.id, [])
         if attachments:
-            lines.append("")
-            lines.append("Attachments:")
+            write("\n\nAttachments:")
             for attachment in attachments:
                 download_url = _build_attachment_download_url(attachment.storage_filename)
                 suffix = f" ({attachment.content_type})"
                 if download_url:
-                    lines.append(f"- [{attachment.filename}]({download_url}){suffix}")
+                    write(f"\n- [{attachment.filename}]({download_url}){suffix}")
                 else:
-                    lines.append(f"- {attachment.filename}{suffix}")
-        lines.append("")
-
-    return "\n".join(lines).strip() + "\n"
-
+                    write(f"\n- {attachment.filename}{suffix}")
+        yield buffer.getvalue()
 
-def _register_reportlab_font(font_path: Path | None, alias: str = "ExportFont") -> str:
-    if not font_path:
-        return "Helvetica"
-    try:
-        pdfmetrics.registerFont(TTFont(alias, str(font_path)))
-        pdfmetrics.registerFontFamily(alias, normal=alias, bold=alias, italic=alias, boldItalic=alias)
-        return alias
-    except Exception:
-        logger.debug("Failed to register reportlab font at %s", font_path, exc_info=True)
-        return "Helvetica"
-
-
-def _register_local_fonts() -> str:
-    global _FONTS_REGISTERED
-    if _FONTS_REGISTERED:
-        return "DejaVuSans"
-
-    fonts_dir = _fonts_dir()
-    regular = fonts_dir / "DejaVuSans.ttf"
-    bold = fonts_dir  / "DejaVuSans-Bold.ttf"
-    italic = fonts_dir  / "DejaVuSans-Oblique.ttf"
-    bold_italic = fonts_dir  / "DejaVuSans-BoldOblique.ttf"
-
-    missing = [p for p in (regular, bold, italic, bold_italic) if not p.exists()]
-    if missing:
-        logger.error("Missing font files for PDF export: %s", missing)
-
-    pdfmetrics.registerFont(TTFont("DejaVuSans", str(regular)))
-    if bold.exists():
-        pdfmetrics.registerFont(TTFont("DejaVuSans-Bold", str(bold)))
-    if italic.exists():
-        pdfmetrics.registerFont(TTFont("DejaVuSans-Italic", str(italic)))
-    if bold_italic.exists():
-        pdfmetrics.registerFont(TTFont("DejaVuSans-BoldItalic", str(bold_italic)))
-
-    pdfmetrics.registerFontFamily(
-        "DejaVuSans",
-        normal="DejaVuSans",
-        bold="DejaVuSans-Bold" if bold.exists() else "DejaVuSans",
-        italic="DejaVuSans-Italic" if italic.exists() else "DejaVuSans",
-        boldItalic="DejaVuSans-BoldItalic" if bold_italic.exists() else "DejaVuSans",
-    )
-    _FONTS_REGISTERED = True
-    return "DejaVuSans"
+    yield "\n"
 
 
-def _build_plain_pdf(markdown_text: str, *, title: str, font_path: Path | None) -> bytes:
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    font_name = _register_local_fonts()
-    font_size = 11
-    leading = 16
-
-    c.setTitle(title)
-    c.setAuthor("GWP Chat")
-    c.setFont(font_name, font_size)
-
-    def new_text_obj():
-        obj = c.beginText()
-        obj.setTextOrigin(40, 780)
-        obj.setLeading(leading)
-        return obj
-
-    text_obj = new_text_obj()
-
-    def flush_page(obj):
-        c.drawText(obj)
-        c.showPage()
-        c.setFont(font_name, font_size)
-        return new_text_obj()
-
-    for paragraph in markdown_text.splitlines():
-        if not paragraph:
-            text_obj.textLine("")
-        else:
-            wrapped_lines = textwrap.wrap(paragraph, width=110) or [paragraph]
-            for line in wrapped_lines:
-                try:
-                    text_obj.textLine(line)
-                except Exception:
-                    text_obj.textLine(line.encode("latin-1", errors="replace").decode("latin-1"))
-        if text_obj.getY() <= 40:
-            text_obj = flush_page(text_obj)
-
-    text_obj = flush_page(text_obj)
-    c.save()
-    return buffer.getvalue()
+def _render_markdown_export(
+    thread: Thread,
+    messages: Sequence[Message],
+    attachments_map: dict[UUID, list[MessageAttachment]],
+) -> str:
+    return "".join(_iter_markdown_export(thread, messages, attachments_map))
 
 
 def _quiet_markdown_logging() -> None:
@@ -237,43 +179,43 @@ def _quiet_markdown_logging() -> None:
         logger.setLevel(logging.WARNING)
 
 
-def _build_pdf_from_markdown(markdown_text: str, *, title: str) -> bytes:
-    _quiet_markdown_logging()
-    pdf = MarkdownPdf(toc_level=0)
-    pdf.meta["title"] = title or "Thread export"
+def _build_pdf_stylesheet() -> str:
+    """Assemble the PDF export stylesheet once; font paths are resolved on first use."""
+    global _PDF_STYLESHEET
+    if _PDF_STYLESHEET is not None:
+        return _PDF_STYLESHEET
 
-    fonts_dir = _fonts_dir()
-    regular = fonts_dir / "DejaVuSans.ttf"
-    bold = fonts_dir / "DejaVuSans-Bold.ttf"
-    italic = fonts_dir / "DejaVuSans-Oblique.ttf"
-    bold_italic = fonts_dir / "DejaVuSans-BoldOblique.ttf"
+    regular = _REGULAR_FONT
+    bold = _BOLD_FONT
+    italic = _ITALIC_FONT
+    bold_italic = _BOLD_ITALIC_FONT
 
     font_face = ""
     try:
         if regular.exists():
             font_face += (
                 "@font-face { font-family: 'DejaVuSans'; font-style: normal; font-weight: normal; "
-                f"src: url('{regular.resolve().as_uri()}') format('truetype'); }} "
+                f"src: url('{regular.as_uri()}') format('truetype'); }} "
             )
         if bold.exists():
             font_face += (
                 "@font-face { font-family: 'DejaVuSans'; font-style: normal; font-weight: bold; "
-                f"src: url('{bold.resolve().as_uri()}') format('truetype'); }} "
+                f"src: url('{bold.as_uri()}') format('truetype'); }} "
             )
         if italic.exists():
             font_face += (
                 "@font-face { font-family: 'DejaVuSans'; font-style: italic; font-weight: normal; "
-                f"src: url('{italic.resolve().as_uri()}') format('truetype'); }} "
+                f"src: url('{italic.as_uri()}') format('truetype'); }} "
             )
         if bold_italic.exists():
             font_face += (
                 "@font-face { font-family: 'DejaVuSans'; font-style: italic; font-weight: bold; "
-                f"src: url('{bold_italic.resolve().as_uri()}') format('truetype'); }} "
+                f"src: url('{bold_italic.as_uri()}') format('truetype'); }} "
             )
     except Exception:
         font_face = ""
 
-    stylesheet = f"""
+    _PDF_STYLESHEET = f"""
     {font_face}
     @page {{
         size: A4;
@@ -296,23 +238,78 @@ def _build_pdf_from_markdown(markdown_text: str, *, title: str) -> bytes:
     em {{ font-style: italic; }}
     code, pre {{ font-family: 'DejaVuSans'; }}
     """
+    return _PDF_STYLESHEET
+
+
+def _weasyprint_resources() -> tuple[Any, Any]:
+    """Load WeasyPrint lazily and share one parsed stylesheet and font configuration."""
+    global _WEASYPRINT_RESOURCES
+    if _WEASYPRINT_RESOURCES is None:
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        stylesheet = CSS(string=_build_pdf_stylesheet(), font_config=font_config)
+        _WEASYPRINT_RESOURCES = (stylesheet, font_config)
+    return _WEASYPRINT_RESOURCES
+
+
+def _build_pdf_with_weasyprint(markdown_text: str, *, title: str) -> bytes:
+    from weasyprint import HTML
+
+    stylesheet, font_config = _weasyprint_resources()
+    html_body = _markdown_converter().reset().convert(markdown_text)
+    html = _wrap_html_document(title or "Thread export", html_body)
+    return HTML(string=html).write_pdf(stylesheets=[stylesheet], font_config=font_config)
+
+
+def _build_pdf_with_markdown_pdf(markdown_text: str, *, title: str) -> bytes:
+    pdf = MarkdownPdf(toc_level=0)
+    pdf.meta["title"] = title or "Thread export"
 
     section = Section(markdown_text, toc=False)
-    pdf.add_section(section, user_css=stylesheet)
+    pdf.add_section(section, user_css=_build_pdf_stylesheet())
 
     buffer = io.BytesIO()
     pdf.save_bytes(buffer)
     return buffer.getvalue()
 
 
+@lru_cache(maxsize=1)
+def _pdf_renderer() -> Callable[..., bytes]:
+    """Pick the configured PDF renderer once; a missing WeasyPrint is reported a single time."""
+    if get_settings().pdf_export_renderer == "weasyprint":
+        try:
+            _weasyprint_resources()
+        except (ImportError, OSError):
+            logger.warning("WeasyPrint is not available; falling back to MarkdownPdf for PDF export", exc_info=True)
+        else:
+            return _build_pdf_with_weasyprint
+    return _build_pdf_with_markdown_pdf
+
+
+def _build_pdf_from_markdown(markdown_text: str, *, title: str) -> bytes:
+    _quiet_markdown_logging()
+    return _pdf_renderer()(markdown_text, title=title)
+
+
+def _wrap_html_document(title: str, html_body: str) -> str:
+    return f"<html><head><meta charset='utf-8'><title>{escape(title)}</title></head><body>{html_body}</body></html>"
+
+
+def _markdown_converter() -> md.Markdown:
+    # Markdown instances are stateful, so each export worker thread keeps its own.
+    converter = getattr(_MARKDOWN_CONVERTERS, "converter", None)
+    if converter is None:
+        converter = md.Markdown(extensions=["extra", "sane_lists", "tables"], output_format="html")
+        _MARKDOWN_CONVERTERS.converter = converter
+    return converter
+
+
 def _build_docx_from_markdown(markdown_text: str, *, title: str) -> bytes:
     _quiet_markdown_logging()
-    html_body = md.markdown(
-        markdown_text,
-        extensions=["extra", "sane_lists", "tables"],
-        output_format="html",
-    )
-    html = f"<html><head><meta charset='utf-8'><title>{escape(title)}</title></head><body>{html_body}</body></html>"
+    html_body = _markdown_converter().reset().convert(markdown_text)
+    html = _wrap_html_document(title, html_body)
 
     try:
         buf = html_to_docx(html, title=title or "Thread export")
@@ -320,11 +317,11 @@ def _build_docx_from_markdown(markdown_text: str, *, title: str) -> bytes:
     except Exception:
         logger.exception("Failed to render DOCX export, falling back to plain text docx")
 
+    if _DocxDocument is None:
+        return markdown_text.encode("utf-8", errors="replace")
     try:
-        from docx import Document
-
         buffer = io.BytesIO()
-        doc = Document()
+        doc = _DocxDocument()
         doc.core_properties.title = title or "Thread export"
         for line in markdown_text.splitlines():
             doc.add_paragraph(line)
@@ -335,24 +332,94 @@ def _build_docx_from_markdown(markdown_text: str, *, title: str) -> bytes:
         return markdown_text.encode("utf-8", errors="replace")
 
 
-def _get_message_attachments(session: Session, message_ids: Sequence[UUID]) -> dict[UUID, list[MessageAttachment]]:
+def _has_markdown_formatting(messages: Sequence[Message]) -> bool:
+    return any(_MARKDOWN_TOKEN_RE.search(msg.text or "") for msg in messages)
+
+
+def _build_docx_from_messages(
+    thread: Thread,
+    messages: Sequence[Message],
+    attachments_map: dict[UUID, list[MessageAttachment]],
+) -> bytes:
+    """Write plain-text threads straight to DOCX, skipping the markdown/HTML round trip."""
+    title = thread.title or f"Thread {thread.id}"
+    doc = _DocxDocument()
+    doc.core_properties.title = title
+    doc.add_heading(title, level=1)
+    doc.add_paragraph(f"Thread ID: {thread.id}", style="List Bullet")
+    doc.add_paragraph(f"Created at: {thread.created_at.isoformat()}", style="List Bullet")
+    doc.add_paragraph(f"Updated at: {thread.updated_at.isoformat()}", style="List Bullet")
+    for key, value in (thread.attributes or {}).items():
+        doc.add_paragraph(f"{key}: {value}", style="List Bullet")
+    doc.add_heading("Messages", level=2)
+
+    for msg in messages:
+        sender = msg.sender_type.value if hasattr(msg.sender_type, "value") else str(msg.sender_type)
+        doc.add_heading(f"{msg.created_at.isoformat()} — {sender}", level=3)
+        for paragraph in (msg.text or "").split("\n\n"):
+            if paragraph.strip():
+                doc.add_paragraph(paragraph)
+
+        attachments = attachments_map.get(msg.id, [])
+        if attachments:
+            doc.add_paragraph("Attachments:")
+            for attachment in attachments:
+                download_url = _build_attachment_download_url(attachment.storage_filename)
+                label = f"{attachment.filename} ({attachment.content_type})"
+                if download_url:
+                    label = f"{label}: {download_url}"
+                doc.add_paragraph(label, style="List Bullet")
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _get_message_attachments(
+    session: Session,
+    message_ids: Sequence[UUID],
+) -> dict[UUID, list[MessageAttachment]]:
     if not message_ids:
         return {}
-    attachments = session.exec(
-        select(MessageAttachment).where(MessageAttachment.message_id.in_(message_ids))
+    # Leave the BLOB in the database; only its length is needed to report size_bytes.
+    rows = session.exec(
+        select(MessageAttachment, func.length(MessageAttachment.data))
+        .options(defer(MessageAttachment.data, raiseload=True))
+        .where(MessageAttachment.message_id.in_(message_ids))
     ).all()
     by_message: dict[UUID, list[MessageAttachment]] = {}
-    for attachment in attachments:
+    for attachment, data_length in rows:
+        if attachment.size_bytes is None and data_length is not None:
+            set_committed_value(attachment, "size_bytes", data_length)
         by_message.setdefault(attachment.message_id, []).append(attachment)
     return by_message
 
 
+def _group_message_rows(
+    rows: Iterable[tuple[Message, MessageAttachment | None]],
+) -> tuple[list[Message], dict[UUID, list[MessageAttachment]]]:
+    """Split ordered (message, attachment) outer-join rows into messages and an attachment map."""
+    messages: list[Message] = []
+    attachments_map: dict[UUID, list[MessageAttachment]] = {}
+    for message, attachment in rows:
+        if not messages or messages[-1] is not message:
+            messages.append(message)
+        if attachment is not None:
+            attachments_map.setdefault(message.id, []).append(attachment)
+    return messages, attachments_map
+
+
+def _encode_attachment_data(data: bytes) -> str:
+    # pybase64 runs a SIMD codec and returns `str` directly, skipping the bytes copy.
+    return pybase64.b64encode_as_string(data)
+
+
 def _attachment_to_read_model(attachment: MessageAttachment, include_data: bool = True) -> MessageAttachmentRead:
-    data_bytes = attachment.data if include_data and attachment.data is not None else None
-    data_base64 = base64.b64encode(data_bytes).decode("utf-8") if data_bytes else None
+    data_bytes = attachment.data if include_data else None
+    data_base64 = _encode_attachment_data(data_bytes) if data_bytes else None
     size_bytes = attachment.size_bytes
-    if size_bytes is None and attachment.data is not None:
-        size_bytes = len(attachment.data)
+    if size_bytes is None and data_bytes is not None:
+        size_bytes = len(data_bytes)
     return MessageAttachmentRead(
         id=attachment.id,
         filename=attachment.filename,
@@ -364,39 +431,53 @@ def _attachment_to_read_model(attachment: MessageAttachment, include_data: bool
     )
 
 
+@lru_cache(maxsize=1)
+def _attachment_base_path() -> str:
+    prefix = (get_settings().api_prefix or "").rstrip("/")
+    return f"{prefix}/attachments" if prefix else "/attachments"
+
+
 def _build_attachment_download_url(storage_filename: str | None) -> str | None:
     if not storage_filename:
         return None
-    settings = get_settings()
-    prefix = (settings.api_prefix or "").rstrip("/")
-    base_path = f"{prefix}/attachments" if prefix else "/attachments"
-    return f"{base_path}/{storage_filename}"
+    return f"{_attachment_base_path()}/{storage_filename}"
+
+
+def _attachment_prompt_part(attachment: MessageAttachment, data: bytes) -> dict[str, object]:
+    data_base64 = _encode_attachment_data(data)
+    content_type = attachment.content_type
+    if content_type.startswith("image/"):
+        return {"type": "input_image", "image_base64": data_base64, "media_type": content_type}
+    return {
+        "type": "input_file",
+        "data": data_base64,
+        "media_type": content_type,
+        "filename": attachment.filename,
+    }
+
+
+def _cached_attachment_prompt_part(attachment: MessageAttachment, data: bytes) -> dict[str, object]:
+    # Attachment rows are never rewritten, so the id identifies the finished part;
+    # the whole history is replayed each turn and would otherwise be re-encoded.
+    # Cached parts are shared between turns and must be treated as read-only.
+    if len(data) > _PROMPT_ATTACHMENT_CACHE_MAX_BYTES:
+        return _attachment_prompt_part(attachment, data)
+    part = _prompt_attachment_cache.get(attachment.id)
+    if part is None:
+        part = _attachment_prompt_part(attachment, data)
+        _prompt_attachment_cache.set(attachment.id, part)
+    return part
 
 
 def _build_prompt_parts(message: Message, attachments: Sequence[MessageAttachment]) -> list[dict[str, object]]:
-    parts: list[dict[str, object]] = [{"type": "text", "text": message.text}]
-    for attachment in attachments:
-        if attachment.data is None:
-            continue
-        data_base64 = base64.b64encode(attachment.data).decode("utf-8")
-        if attachment.content_type.startswith("image/"):
-            parts.append(
-                {
-                    "type": "input_image",
-                    "image_base64": data_base64,
-                    "media_type": attachment.content_type,
-                }
-            )
-        else:
-            parts.append(
-                {
-                    "type": "input_file",
-                    "data": data_base64,
-                    "media_type": attachment.content_type,
-                    "filename": attachment.filename,
-                }
-            )
-    return parts
+    return [
+        {"type": "text", "text": message.text},
+        *(
+            _cached_attachment_prompt_part(attachment, data)
+            for attachment in attachments
+            if (data := attachment.data) is not None
+        ),
+    ]
 
 
 def _collect_provider_attachments(
@@ -417,12 +498,11 @@ def _collect_provider_attachments(
         buffer[key] = attachment
 
 
-def _persist_provider_attachments(
-    session: Session,
+def _build_provider_attachments(
     message: Message,
     attachments: Sequence[dict[str, Any]],
 ) -> list[MessageAttachment]:
-    persisted: list[MessageAttachment] = []
+    records: list[MessageAttachment] = []
     for attachment in attachments:
         storage_filename = attachment.get("storage_filename")
         if not isinstance(storage_filename, str) or not storage_filename:
@@ -443,9 +523,8 @@ def _persist_provider_attachments(
             storage_filename=storage_filename,
             size_bytes=size_bytes,
         )
-        persisted.append(record)
-        session.add(record)
-    return persisted
+        records.append(record)
+    return records
 
 
 def _coerce_int(value: object) -> int | None:
@@ -466,13 +545,81 @@ def _truncate(text: str, length: int) -> str:
 
 
 def _sanitize_title_fragment(fragment: str) -> str:
-    return fragment.replace("[", "").replace("]", "").strip()
+    return fragment.translate(_TITLE_BRACKETS_TABLE).strip()
 
 
 def _should_assign_default_title(thread: Thread) -> bool:
     return thread.title is None or thread.title.strip() == ""
 
 
+def _model_response(
+    model: BaseModel,
+    status_code: int = status.HTTP_200_OK,
+    headers: dict[str, str] | None = None,
+) -> ORJSONResponse:
+    # Returning a response skips FastAPI's dump/re-validate pass over a model
+    # the route already built; `response_model` still documents the schema.
+    return ORJSONResponse(model.model_dump(mode="json"), status_code=status_code, headers=headers)
+
+
+def _thread_etag(session: Session, thread: Thread, *variant: object) -> tuple[str, int]:
+    """Return the thread's ETag and its message count, read in one aggregate."""
+    # A new, updated or failed message always moves the newest `updated_at` or
+    # the count, so one aggregate over the thread index versions its contents.
+    last_updated_at, message_count = session.exec(
+        select(func.max(Message.updated_at), func.count()).where(Message.thread_id == thread.id)
+    ).one()
+    version = "|".join(
+        str(part)
+        for part in (thread.id, thread.updated_at.isoformat(), last_updated_at, message_count, *variant)
+    )
+    return '"%s"' % hashlib.blake2b(version.encode(), digest_size=8).hexdigest(), message_count
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _etag_headers(etag: str) -> dict[str, str]:
+    # Private data: caches may keep it but must revalidate before reuse.
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag))
+
+
+def _encode_message_cursor(message: Message) -> str:
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return pybase64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_message_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = pybase64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_raw, _, id_raw = raw.partition("|")
+        return datetime.fromisoformat(created_raw), UUID(id_raw)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def _page_total(
+    session: Session,
+    rows: Sequence[Any],
+    entity: type[Thread] | type[Message],
+    filters: Sequence[Any],
+) -> int:
+    # Page queries carry `count(*) OVER ()`, so the total arrives with the rows.
+    # Only a page past the end comes back empty and needs a separate count.
+    if rows:
+        return int(rows[0][1])
+    return session.exec(select(func.count()).select_from(entity).where(*filters)).one()
+
+
 def _ensure_thread(
     session: Session,
     thread_id: UUID,
@@ -489,12 +636,27 @@ def _ensure_thread(
     return thread
 
 
+async def _ensure_thread_async(session: Session, thread_id: UUID, owner_id: str) -> Thread:
+    """``_ensure_thread`` for async routes, which run on the event loop every
+    open stream shares; the blocking lookup goes to a worker thread instead."""
+    return await asyncio.to_thread(_ensure_thread, session, thread_id, owner_id)
+
+
 def _extract_chunk_text(chunk: dict[str, Any]) -> str:
+    # Fast path: streamed deltas carry their text at choices[0]["delta"].
+    try:
+        delta = chunk["choices"][0]["delta"]
+        text = delta.get("text") or delta.get("content")
+    except (KeyError, IndexError, TypeError, AttributeError):
+        text = None
+    if type(text) is str and text.strip():
+        return text
+
     choices = chunk.get("choices")
-    if not isinstance(choices, list):
+    if type(choices) is not list:
         return ""
     for choice in choices:
-        if not isinstance(choice, dict):
+        if type(choice) is not dict:
             continue
         for key in ("delta", "message"):
             candidate = choice.get(key)
@@ -505,18 +667,18 @@ def _extract_chunk_text(chunk: dict[str, Any]) -> str:
 
 
 def _extract_text_from_candidate(candidate: Any) -> str:
-    if not isinstance(candidate, dict):
+    if type(candidate) is not dict:
         return ""
     direct = candidate.get("text")
-    if isinstance(direct, str) and direct.strip():
+    if type(direct) is str and direct.strip():
         return direct
     content = candidate.get("content")
-    if isinstance(content, list):
+    if type(content) is list:
         for part in content:
-            if not isinstance(part, dict):
+            if type(part) is not dict:
                 continue
             text = part.get("text")
-            if isinstance(text, str) and text.strip():
+            if type(text) is str and text.strip():
                 return text
     return ""
 
@@ -579,20 +741,29 @@ def _normalize_metadata_value(value: object) -> str | None:
 
 
 def _extract_metadata_value(metadata: dict | None, keys: tuple[str, ...]) -> str | None:
-    if not metadata:
+    # Most threads carry no product/agent scoping; rule that out in one C-level pass.
+    if not metadata or metadata.keys().isdisjoint(keys):
         return None
+    get = metadata.get
     for key in keys:
-        if key not in metadata:
+        value = get(key)
+        if value is None:
             continue
-        candidate = _normalize_metadata_value(metadata[key])
+        candidate = _normalize_metadata_value(value)
         if candidate:
             return candidate
     return None
 
 
 def _enforce_metadata_permissions(user: AuthenticatedUser, metadata: dict | None) -> None:
-    ensure_product_access(user, _extract_metadata_value(metadata, _METADATA_PRODUCT_KEYS))
-    ensure_agent_access(user, _extract_metadata_value(metadata, _METADATA_AGENT_KEYS))
+    if not metadata:
+        return
+    product_id = _extract_metadata_value(metadata, _METADATA_PRODUCT_KEYS)
+    if product_id:
+        ensure_product_access(user, product_id)
+    agent_id = _extract_metadata_value(metadata, _METADATA_AGENT_KEYS)
+    if agent_id:
+        ensure_agent_access(user, agent_id)
 
 
 @router.post("", response_model=ThreadRead, status_code=status.HTTP_201_CREATED)
@@ -612,7 +783,6 @@ def create_thread(
     )
     session.add(thread)
     session.commit()
-    session.refresh(thread)
     return ThreadRead.model_validate(thread)
 
 
@@ -631,20 +801,18 @@ def list_threads(
         filters.append(Thread.is_deleted.is_(False))
         filters.append(Thread.title.is_not(None))
         filters.append(Thread.title != "")
-        message_thread_ids = select(Message.thread_id)
-        filters.append(Thread.id.in_(message_thread_ids))
+        filters.append(exists().where(Message.thread_id == Thread.id))
 
-    total = session.exec(
-        select(func.count()).select_from(Thread).where(*filters)
-    ).one()
     query = (
-        select(Thread)
+        select(Thread, func.count().over().label("total"))
         .where(*filters)
         .order_by(Thread.created_at.desc())
         .offset((page - 1) * limit)
         .limit(limit)
     )
-    items = session.exec(query).all()
+    rows = session.exec(query).all()
+    items = [row[0] for row in rows]
+    total = _page_total(session, rows, Thread, filters)
     pagination = build_pagination(page=page, limit=limit, total=total)
     return ThreadListResponse(
         items=[ThreadRead.model_validate(item) for item in items],
@@ -655,13 +823,17 @@ def list_threads(
 @router.get("/{thread_id}", response_model=ThreadDetail)
 def get_thread(
     thread_id: UUID,
+    request: Request,
     messages_limit: int = Query(default=5, ge=1, le=50),
     session: Session = Depends(get_session),
     current_user: AuthenticatedUser = Depends(get_current_user),
-) -> ThreadDetail:
+) -> Response:
     user_id = current_user.user_id
     thread = _ensure_thread(session, thread_id, user_id)
     _enforce_metadata_permissions(current_user, thread.attributes)
+    etag, _ = _thread_etag(session, thread, messages_limit)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     message_stmt = (
         select(Message)
         .where(Message.thread_id == thread_id)
@@ -679,7 +851,7 @@ def get_thread(
             for att in attachments_map.get(msg.id, [])
         ]
         thread_detail.last_messages.append(msg_read)
-    return thread_detail
+    return _model_response(thread_detail, headers=_etag_headers(etag))
 
 
 @router.patch("/{thread_id}", response_model=ThreadRead)
@@ -713,11 +885,24 @@ def update_thread(
         thread.updated_at = utcnow()
         session.add(thread)
         session.commit()
-        session.refresh(thread)
 
     return ThreadRead.model_validate(thread)
 
 
+def _soft_delete_thread(session: Session, thread_id: UUID, current_user: AuthenticatedUser) -> bool:
+    thread = _ensure_thread(session, thread_id, current_user.user_id, include_deleted=True)
+    _enforce_metadata_permissions(current_user, thread.attributes)
+    if thread.is_deleted:
+        return False
+    thread.is_deleted = True
+    deleted_at = utcnow()
+    thread.deleted_at = deleted_at
+    thread.updated_at = deleted_at
+    session.add(thread)
+    session.commit()
+    return True
+
+
 @router.delete(
     "/{thread_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -729,51 +914,65 @@ async def delete_thread(
     current_user: AuthenticatedUser = Depends(get_current_user),
     search_index: SearchIndexService | None = Depends(get_optional_search_index_service),
 ) -> Response:
-    user_id = current_user.user_id
-    thread = _ensure_thread(session, thread_id, user_id, include_deleted=True)
-    _enforce_metadata_permissions(current_user, thread.attributes)
-    if thread.is_deleted:
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
-    thread.is_deleted = True
-    thread.deleted_at = utcnow()
-    thread.updated_at = utcnow()
-    session.add(thread)
-    session.commit()
-    session.refresh(thread)
-
-    if search_index is not None:
+    # Session I/O is blocking; only the index call below is awaited on the loop.
+    deleted = await asyncio.to_thread(_soft_delete_thread, session, thread_id, current_user)
+    if deleted and search_index is not None:
         try:
-            await search_index.delete_thread(str(thread.id))
+            await search_index.delete_thread(str(thread_id))
         except Exception:  # pragma: no cover - best effort logging
-            logger.exception("Failed to delete thread %s from semantic index", thread.id)
+            logger.exception("Failed to delete thread %s from semantic index", thread_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("/{thread_id}/messages", response_model=PaginatedResponse[MessageRead])
+@router.get("/{thread_id}/messages", response_model=MessageListResponse)
 def list_messages(
     thread_id: UUID,
+    request: Request,
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=None, ge=1),
+    cursor: str | None = Query(default=None),
     session: Session = Depends(get_session),
     current_user: AuthenticatedUser = Depends(get_current_user),
-) -> PaginatedResponse[MessageRead]:
+) -> Response:
     user_id = current_user.user_id
     thread = _ensure_thread(session, thread_id, user_id)
     _enforce_metadata_permissions(current_user, thread.attributes)
     limit = clamp_limit(limit)
+    # Keyset pages have no page number; a stray one must not split the cache either.
+    page_number = None if cursor else page
+    etag, message_count = _thread_etag(session, thread, page_number, limit, cursor)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
 
     base_filters = [Message.thread_id == thread_id]
-    total = session.exec(
-        select(func.count()).select_from(Message).where(*base_filters)
-    ).one()
-
-    messages = session.exec(
-        select(Message)
-        .where(*base_filters)
-        .order_by(Message.created_at.desc())
-        .offset((page - 1) * limit)
-        .limit(limit)
-    ).all()
+    newest_first = (Message.created_at.desc(), Message.id.desc())
+    if cursor:
+        # Keyset page: seek past the cursor row instead of discarding OFFSET rows,
+        # so deep pages of long threads cost the same as the first one.
+        cursor_created_at, cursor_id = _decode_message_cursor(cursor)
+        messages = list(
+            session.exec(
+                select(Message)
+                .where(*base_filters, tuple_(Message.created_at, Message.id) < (cursor_created_at, cursor_id))
+                .order_by(*newest_first)
+                .limit(limit + 1)
+            ).all()
+        )
+        has_more = len(messages) > limit
+        del messages[limit:]
+        # The ETag aggregate already counted this thread's messages.
+        total = message_count
+    else:
+        rows = session.exec(
+            select(Message, func.count().over().label("total"))
+            .where(*base_filters)
+            .order_by(*newest_first)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        ).all()
+        messages = [row[0] for row in rows]
+        total = _page_total(session, rows, Message, base_filters)
+        has_more = page * limit < total
 
     attachments_map = _get_message_attachments(session, [msg.id for msg in messages])
     message_items: list[MessageRead] = []
@@ -785,57 +984,107 @@ def list_messages(
         ]
         message_items.append(item)
 
-    pagination = build_pagination(page=page, limit=limit, total=total)
-    return PaginatedResponse[MessageRead](
-        items=message_items,
-        pagination=pagination,
+    pagination = build_pagination(
+        page=page_number,
+        limit=limit,
+        total=total,
+        has_more=has_more,
+        next_cursor=_encode_message_cursor(messages[-1]) if has_more and messages else None,
+    )
+    return _model_response(
+        MessageListResponse(
+            items=message_items,
+            pagination=pagination,
+        ),
+        headers=_etag_headers(etag),
     )
 
 
+_EXPORT_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def _aiter_bytes(payload: bytes, chunk_size: int = _EXPORT_STREAM_CHUNK_SIZE):
+    view = memoryview(payload)
+    for offset in range(0, len(view), chunk_size):
+        yield view[offset : offset + chunk_size]
+
+
+def _render_export_document(
+    format: str,
+    thread: Thread,
+    messages: Sequence[Message],
+    attachments_map: dict[UUID, list[MessageAttachment]],
+) -> bytes:
+    title = thread.title or str(thread.id)
+    if format == "docx" and _DocxDocument is not None and not _has_markdown_formatting(messages):
+        return _build_docx_from_messages(thread, messages, attachments_map)
+    markdown_text = _render_markdown_export(thread, messages, attachments_map)
+    if format == "pdf":
+        return _build_pdf_from_markdown(markdown_text, title=title)
+    return _build_docx_from_markdown(markdown_text, title=title)
+
+
+async def _aiter_markdown_export(chunks: Iterable[str]):
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def _load_export_data(
+    session: Session,
+    thread_id: UUID,
+    current_user: AuthenticatedUser,
+) -> tuple[Thread, list[Message], dict[UUID, list[MessageAttachment]]]:
+    thread = _ensure_thread(session, thread_id, current_user.user_id)
+    _enforce_metadata_permissions(current_user, thread.attributes)
+
+    # One outer-joined statement; the export only links attachments by name, so
+    # their bytes stay in the database.
+    rows = session.exec(
+        select(Message, MessageAttachment)
+        .outerjoin(MessageAttachment, MessageAttachment.message_id == Message.id)
+        .options(defer(MessageAttachment.data, raiseload=True))
+        .where(Message.thread_id == thread_id)
+        .order_by(Message.created_at, Message.id, MessageAttachment.created_at)
+    )
+    messages, attachments_map = _group_message_rows(rows)
+    return thread, messages, attachments_map
+
+
 @router.get("/{thread_id}/export")
-def export_thread(
+async def export_thread(
     thread_id: UUID,
     format: str = Query(default="markdown", pattern="^(pdf|markdown|docx)$"),
     session: Session = Depends(get_session),
     current_user: AuthenticatedUser = Depends(get_current_user),
 ) -> Response:
-    user_id = current_user.user_id
-    thread = _ensure_thread(session, thread_id, user_id)
-    _enforce_metadata_permissions(current_user, thread.attributes)
-
-    messages: list[Message] = session.exec(
-        select(Message).where(Message.thread_id == thread_id).order_by(Message.created_at.asc())
-    ).all()
-    attachments_map = _get_message_attachments(session, [msg.id for msg in messages])
-
-    markdown_text = _render_markdown_export(thread, messages, attachments_map)
+    # Database reads and document rendering are blocking; keep them off the event loop.
+    thread, messages, attachments_map = await asyncio.to_thread(
+        _load_export_data, session, thread_id, current_user
+    )
     filename_base = _sanitize_export_filename(thread.title, thread.id)
 
     ext = "md" if format == "markdown" else "pdf" if format == "pdf" else "docx"
     utf8_filename = f"{thread.title or thread.id}.{ext}"
     if format == "markdown":
         disposition = _build_content_disposition(f"{filename_base}.md", utf8_filename)
-        return Response(
-            content=markdown_text,
+        return StreamingResponse(
+            _aiter_markdown_export(_iter_markdown_export(thread, messages, attachments_map)),
             media_type="text/markdown",
             headers={"Content-Disposition": disposition},
         )
 
-    if format == "pdf":
-        pdf_bytes = _build_pdf_from_markdown(markdown_text, title=thread.title or str(thread.id))
-        disposition = _build_content_disposition(f"{filename_base}.pdf", utf8_filename)
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": disposition},
-        )
+    document = await asyncio.to_thread(_render_export_document, format, thread, messages, attachments_map)
+    media_type = (
+        "application/pdf"
+        if format == "pdf"
+        else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    )
 
-    docx_bytes = _build_docx_from_markdown(markdown_text, title=thread.title or str(thread.id))
-    disposition = _build_content_disposition(f"{filename_base}.docx", utf8_filename)
-    return Response(
-        content=docx_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": disposition},
+    disposition = _build_content_disposition(f"{filename_base}.{ext}", utf8_filename)
+    return StreamingResponse(
+        _aiter_bytes(document),
+        media_type=media_type,
+        headers={"Content-Disposition": disposition, "Content-Length": str(len(document))},
     )
 
 
@@ -846,6 +1095,188 @@ _ROLE_BY_SENDER: dict[SenderType, str] = {
 }
 
 
+def _decode_base64(data: str) -> bytes:
+    # The validating decoder is pybase64's vectorised path; wrapped or otherwise
+    # non-canonical payloads fall back to the lenient decoder they always used.
+    try:
+        return pybase64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError):
+        return pybase64.b64decode(data)
+
+
+def _decode_attachment_payloads(attachments: Sequence[MessageAttachmentCreate]) -> list[bytes]:
+    max_bytes = get_settings().attachments_max_upload_bytes
+    for attachment_payload in attachments:
+        # Size check on the encoded length so oversized uploads are never decoded.
+        if len(attachment_payload.data_base64) * 3 // 4 > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Attachment exceeds the maximum allowed size",
+            )
+    binaries: list[bytes] = []
+    for attachment_payload in attachments:
+        try:
+            binaries.append(_decode_base64(attachment_payload.data_base64))
+        except (binascii.Error, ValueError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid attachment encoding",
+            ) from exc
+    return binaries
+
+
+def _thread_has_messages(session: Session, thread_id: UUID) -> bool:
+    return session.exec(select(exists().where(Message.thread_id == thread_id))).one()
+
+
+def _get_conversation_state(session: Session, thread_id: UUID, provider: str) -> ProviderThreadState | None:
+    stmt = select(ProviderThreadState).where(
+        ProviderThreadState.thread_id == thread_id,
+        ProviderThreadState.provider == provider,
+    )
+    return session.exec(stmt).one_or_none()
+
+
+def _last_sent_message_id(conversation_state: ProviderThreadState | None) -> UUID | None:
+    value = (conversation_state.payload or {}).get("last_message_id") if conversation_state else None
+    if not value:
+        return None
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _commit_and_load_prompt_history(
+    session: Session,
+    thread_id: UUID,
+    user_message: Message,
+    new_attachments: Sequence[MessageAttachment] = (),
+    *,
+    summary: str | None = None,
+    resume_after: UUID | None = None,
+) -> tuple[list[ChatPromptMessage], list[MessageAttachmentRead]]:
+    user_message_id = user_message.id
+    if new_attachments:
+        # Ids are generated client-side, so the rows go out as one bulk INSERT
+        # without unit-of-work tracking; the message is flushed first for the FK.
+        session.flush()
+        session.exec(insert(MessageAttachment), params=[attachment.model_dump() for attachment in new_attachments])
+    session.commit()
+    if resume_after is not None:
+        # The provider already holds everything up to `resume_after`; if nothing
+        # else landed in the thread since, only the new message has to be sent.
+        previous_id = session.exec(
+            select(Message.id)
+            .where(Message.thread_id == thread_id, Message.id != user_message_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+        ).first()
+        if previous_id == resume_after:
+            session.commit()
+            prompt_message = ChatPromptMessage(
+                role=_ROLE_BY_SENDER.get(user_message.sender_type, "user"),
+                parts=_build_prompt_parts(user_message, new_attachments),
+                metadata=user_message.meta or None,
+            )
+            return [prompt_message], [_attachment_to_read_model(attachment) for attachment in new_attachments]
+    # Messages and their attachments come back in one outer-joined statement.
+    history_stmt = (
+        select(Message, MessageAttachment)
+        .outerjoin(MessageAttachment, MessageAttachment.message_id == Message.id)
+        .where(Message.thread_id == thread_id)
+        .order_by(Message.created_at, Message.id, MessageAttachment.created_at)
+    )
+    history_window = get_settings().llm_history_window
+    if history_window > 0:
+        # Only the most recent messages are replayed; a join keeps the LIMIT
+        # off the attachment rows so multi-attachment messages count once.
+        recent = (
+            select(Message.id)
+            .where(Message.thread_id == thread_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(history_window)
+            .subquery()
+        )
+        history_stmt = history_stmt.join(recent, recent.c.id == Message.id)
+    history, attachments_map = _group_message_rows(session.exec(history_stmt))
+    role_for = _ROLE_BY_SENDER.get
+    build_parts = _build_prompt_parts
+    attachments_for = attachments_map.get
+    prompt_messages = [
+        ChatPromptMessage(
+            role=role_for(msg.sender_type, "user"),
+            parts=build_parts(msg, attachments_for(msg.id, ())),
+            metadata=msg.meta or None,
+        )
+        for msg in history
+    ]
+    if history_window > 0 and summary and len(history) >= history_window:
+        prompt_messages.insert(
+            0,
+            ChatPromptMessage(role="system", parts=[{"type": "text", "text": summary}]),
+        )
+    user_attachments = [
+        _attachment_to_read_model(attachment) for attachment in attachments_for(user_message_id, ())
+    ]
+    # Everything the request needs from the history is now plain data; end the
+    # read transaction so the pooled connection is not held while the agent streams.
+    session.commit()
+    return prompt_messages, user_attachments
+
+
+def _save_conversation_state(
+    session: Session,
+    conversation_state: ProviderThreadState | None,
+    *,
+    thread_id: UUID,
+    provider: str,
+    conversation_id: str,
+    model: str,
+    model_label: str | None,
+    last_message_id: UUID,
+    updated_at: datetime,
+) -> None:
+    if conversation_state is None:
+        conversation_state = ProviderThreadState(
+            thread_id=thread_id,
+            provider=provider,
+            conversation_id=conversation_id,
+            payload={
+                "model": model,
+                "model_label": model_label,
+                "last_message_id": str(last_message_id),
+            },
+        )
+    else:
+        conversation_state.conversation_id = conversation_id
+        current_payload = dict(conversation_state.payload or {})
+        current_payload["model"] = model
+        if model_label:
+            current_payload["model_label"] = model_label
+        current_payload["last_message_id"] = str(last_message_id)
+        conversation_state.payload = current_payload
+        conversation_state.updated_at = updated_at
+    session.add(conversation_state)
+
+
+async def _index_messages(
+    search_index: SearchIndexService,
+    messages: Sequence[Message],
+    thread: Thread,
+    model_label: str | None,
+) -> None:
+    for message in messages:
+        try:
+            await search_index.index_message(
+                message=message,
+                thread=thread,
+                model_label=model_label,
+            )
+        except Exception:  # pragma: no cover - best effort logging
+            logger.exception("Failed to index message %s for semantic search", message.id)
+
+
 async def _process_message_creation(
     *,
     thread: Thread,
@@ -854,56 +1285,66 @@ async def _process_message_creation(
     user_id: str,
     chat_service: OpenAIChatService,
     search_index: SearchIndexService | None,
+    background_tasks: BackgroundTasks,
     chunk_callback: OpenAIChatService.ChunkCallback | None = None,
 ) -> MessageRead:
     model_from_payload = payload.model.strip() if payload.model else None
-    thread_attributes = dict(thread.attributes or {})
-    model_name = model_from_payload or thread_attributes.get("model")
+    current_attributes = thread.attributes or {}
+    model_name = model_from_payload or current_attributes.get("model")
     if model_name is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Model is required")
 
-    if model_from_payload and thread_attributes.get("model") != model_from_payload:
-        thread_attributes["model"] = model_from_payload
-    elif "model" not in thread_attributes:
-        thread_attributes["model"] = model_name
-
-    model_label_raw = (payload.model_label or thread_attributes.get("model_label") or model_name or "").strip()
-    if model_label_raw:
-        thread_attributes["model_label"] = model_label_raw
-    else:
-        thread_attributes.pop("model_label", None)
+    model_label_raw = (payload.model_label or current_attributes.get("model_label") or model_name or "").strip()
+    model_label = model_label_raw or None
 
-    existing_message_count = session.exec(
-        select(func.count()).select_from(Message).where(Message.thread_id == thread.id)
-    ).one()
+    thread_id = thread.id
     user_text = (payload.text or "").strip()
     if not user_text:
         default_text = "Process as expected."
         payload = payload.model_copy(update={"text": default_text})
         user_text = default_text
 
-    if user_text and (existing_message_count == 0 or _should_assign_default_title(thread)):
+    # Untitled threads are renamed anyway; only titled ones need the EXISTS probe.
+    if user_text and (
+        _should_assign_default_title(thread)
+        or not await asyncio.to_thread(_thread_has_messages, session, thread_id)
+    ):
         product_label = _sanitize_title_fragment(model_label_raw or model_name) or _DEFAULT_THREAD_PREFIX
         preview = _sanitize_title_fragment(_truncate(user_text, 32))
         thread.title = f"{product_label}: {preview}"
-        thread.updated_at = utcnow()
-
-    provider_key = thread_attributes.get("provider") or _DEFAULT_PROVIDER
-    thread_attributes["provider"] = provider_key
 
-    if thread_attributes != thread.attributes:
+    provider_key = current_attributes.get("provider") or _DEFAULT_PROVIDER
+
+    # Copy the JSON attributes only when this message actually changes them; a
+    # continued conversation usually matches on all three fields.
+    if (
+        thread.attributes is None
+        or current_attributes.get("model") != model_name
+        or current_attributes.get("provider") != provider_key
+        or (
+            current_attributes.get("model_label") != model_label
+            if model_label
+            else "model_label" in current_attributes
+        )
+    ):
+        thread_attributes = {**current_attributes, "model": model_name, "provider": provider_key}
+        if model_label:
+            thread_attributes["model_label"] = model_label
+        else:
+            thread_attributes.pop("model_label", None)
         thread.attributes = thread_attributes
 
-    conversation_state_stmt = select(ProviderThreadState).where(
-        ProviderThreadState.thread_id == thread.id,
-        ProviderThreadState.provider == provider_key,
-    )
     provider_attachments_buffer: dict[str, dict[str, Any]] = {}
-    conversation_state = session.exec(conversation_state_stmt).one_or_none()
+    conversation_state = await asyncio.to_thread(_get_conversation_state, session, thread_id, provider_key)
     active_conversation_id = conversation_state.conversation_id if conversation_state else None
+    resume_after = (
+        _last_sent_message_id(conversation_state)
+        if active_conversation_id and get_settings().llm_incremental_prompts
+        else None
+    )
 
     user_message = Message(
-        thread_id=thread.id,
+        thread_id=thread_id,
         sender_id=payload.sender_id,
         sender_type=payload.sender_type,
         status=MessageStatus.QUEUED,
@@ -913,63 +1354,52 @@ async def _process_message_creation(
         correlation_id=payload.correlation_id,
         error_code=payload.error_code,
     )
-    session.add(user_message)
-    thread.updated_at = utcnow()
-    session.add(thread)
-    session.commit()
-    session.refresh(user_message)
-
+    user_message_id = user_message.id
     new_attachments: list[MessageAttachment] = []
     if payload.attachments:
-        for attachment_payload in payload.attachments:
-            try:
-                binary = base64.b64decode(attachment_payload.data_base64)
-            except (binascii.Error, ValueError) as exc:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid attachment encoding",
-                ) from exc
-            attachment = MessageAttachment(
-                message_id=user_message.id,
-                filename=attachment_payload.filename,
-                content_type=attachment_payload.content_type or "application/octet-stream",
-                data=binary,
-                size_bytes=len(binary),
+        # Multi-megabyte decodes would otherwise stall every stream on the loop.
+        binaries = await asyncio.to_thread(_decode_attachment_payloads, payload.attachments)
+        for attachment_payload, binary in zip(payload.attachments, binaries):
+            new_attachments.append(
+                MessageAttachment(
+                    message_id=user_message.id,
+                    filename=attachment_payload.filename,
+                    content_type=attachment_payload.content_type or "application/octet-stream",
+                    data=binary,
+                    size_bytes=len(binary),
+                )
             )
-            session.add(attachment)
-            new_attachments.append(attachment)
-        session.commit()
-        for attachment in new_attachments:
-            session.refresh(attachment)
 
-    attachments_map: dict[UUID, list[MessageAttachment]] = {}
-
-    try:
-        history_stmt = (
-            select(Message)
-            .where(Message.thread_id == thread.id)
-            .order_by(Message.created_at)
+    # The message and its attachments land in one transaction; it is committed
+    # before the LLM call so the write lock is not held while the agent streams.
+    # The thread is already attached, so pending title/attribute edits ride along,
+    # and the touch below moves it to the top of `updated_at`-ordered lists (and
+    # invalidates its ETag) as soon as the user's message is stored.
+    thread.updated_at = utcnow()
+    session.add(user_message)
+    # Session I/O is blocking; run it in worker threads so concurrent streams keep flowing.
+    prompt_messages, user_attachments = await asyncio.to_thread(
+        partial(
+            _commit_and_load_prompt_history,
+            session,
+            thread_id,
+            user_message,
+            new_attachments,
+            summary=(thread.summary or "").strip() or None,
+            resume_after=resume_after,
         )
-        history = session.exec(history_stmt).all()
-        attachments_map = _get_message_attachments(session, [msg.id for msg in history])
-        prompt_messages = [
-            ChatPromptMessage(
-                role=_ROLE_BY_SENDER.get(msg.sender_type, "user"),
-                parts=_build_prompt_parts(msg, attachments_map.get(msg.id, [])),
-                metadata=msg.meta or None,
-            )
-            for msg in history
-        ]
+    )
 
-        total_prompt_attachments = sum(
-            1
-            for message in prompt_messages
-            for part in message.parts
-            if part.get("type") != "text"
-        )
+    # The status commit in flight, if any; cleanup after a cancel must not touch
+    # the session until that worker thread is done with it.
+    pending_commit: dict[str, asyncio.Task[None] | None] = {"task": None}
+
+    try:
+        # Every prompt message carries exactly one leading text part.
+        total_prompt_attachments = sum(len(message.parts) - 1 for message in prompt_messages)
         logger.info(
             "Dispatching OpenAI-compatible completion: thread_id=%s model=%s user_id=%s messages=%s attachments=%s conversation_id=%s",
-            thread.id,
+            thread_id,
             model_name,
             user_id,
             len(prompt_messages),
@@ -979,29 +1409,25 @@ async def _process_message_creation(
         if logger.isEnabledFor(logging.DEBUG):
             prompt_preview: list[dict[str, object]] = []
             for idx, prompt_message in enumerate(prompt_messages):
-                text_part = next(
-                    (
-                        part.get("text")
-                        for part in prompt_message.parts
-                        if part.get("type") == "text"
-                    ),
-                    "",
-                )
+                text_part = ""
+                attachment_types: list[object] = []
+                for part in prompt_message.parts:
+                    part_type = part.get("type")
+                    if part_type != "text":
+                        attachment_types.append(part_type)
+                    elif not text_part:
+                        text_part = part.get("text") or ""
                 prompt_preview.append(
                     {
                         "idx": idx,
                         "role": prompt_message.role,
                         "text_preview": _truncate(text_part, 120),
-                        "attachments": [
-                            part.get("type")
-                            for part in prompt_message.parts
-                            if part.get("type") != "text"
-                        ],
+                        "attachments": attachment_types,
                     }
                 )
             logger.debug(
                 "OpenAI-compatible completion payload summary: thread_id=%s payload=%s",
-                thread.id,
+                thread_id,
                 prompt_preview,
             )
 
@@ -1019,22 +1445,22 @@ async def _process_message_creation(
                 return
             user_message.status = target_status
             user_message.updated_at = utcnow()
-            thread.updated_at = utcnow()
-            session.add(user_message)
-            session.add(thread)
-            session.commit()
-            session.refresh(user_message)
-            session.refresh(thread)
+            commit_task = asyncio.create_task(asyncio.to_thread(session.commit))
+            pending_commit["task"] = commit_task
+            # Shielded: a cancel stops the wait, not the commit the thread is running.
+            await asyncio.shield(commit_task)
             logger.info(
                 "Updated message status from agent stream: message_id=%s agent_status=%s mapped_status=%s",
-                user_message.id,
+                user_message_id,
                 agent_status,
                 target_status.value,
             )
 
         async def handle_stream_chunk(chunk: dict[str, Any]) -> None:
-            chunk = _enrich_interrupt_chunk_content(chunk)
-            _collect_provider_attachments(provider_attachments_buffer, chunk)
+            # Both helpers only act on `message_metadata`; plain token deltas skip them.
+            if "message_metadata" in chunk:
+                chunk = _enrich_interrupt_chunk_content(chunk)
+                _collect_provider_attachments(provider_attachments_buffer, chunk)
             if chunk_callback is None:
                 return
             result = chunk_callback(chunk)
@@ -1057,7 +1483,7 @@ async def _process_message_creation(
             )
         logger.info(
             "OpenAI-compatible completion succeeded: thread_id=%s model=%s response_id=%s conversation_id=%s",
-            thread.id,
+            thread_id,
             model_name,
             completion.response_id,
             completion.conversation_id,
@@ -1089,7 +1515,7 @@ async def _process_message_creation(
                 "OpenAI-compatible completion failed: thread_id=%s model=%s user_id=%s "
                 "conversation_id=%s status_code=%s error_type=%s error_code=%s request_id=%s detail=%s"
             ),
-            thread.id,
+            thread_id,
             model_name,
             user_id,
             active_conversation_id,
@@ -1102,21 +1528,44 @@ async def _process_message_creation(
         if getattr(exc, "extra", None):
             logger.debug(
                 "LLM provider error context: thread_id=%s extra=%s",
-                thread.id,
+                thread_id,
                 exc.extra,
             )
         user_message.status = MessageStatus.ERROR
         user_message.error_code = _truncate(error_detail, 128)
-        user_message.updated_at = utcnow()
-        session.add(user_message)
-        thread.updated_at = utcnow()
-        session.add(thread)
-        session.commit()
+        failed_at = utcnow()
+        user_message.updated_at = failed_at
+        thread.updated_at = failed_at
+        await asyncio.to_thread(session.commit)
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=error_detail,
         ) from exc
-
+    except (asyncio.CancelledError, anyio.BrokenResourceError):
+        # The client went away mid-stream; without this the message would stay
+        # "processing" forever since no completion will ever be stored for it.
+        logger.info(
+            "Completion stream abandoned by client: thread_id=%s message_id=%s",
+            thread_id,
+            user_message_id,
+        )
+        commit_task = pending_commit["task"]
+        if commit_task is not None and not commit_task.done():
+            # Sessions are not thread-safe; let the in-flight commit finish first.
+            # `wait` does not cancel what it waits on, unlike awaiting the task.
+            await asyncio.wait({commit_task})
+            if commit_task.exception() is not None:
+                await asyncio.to_thread(session.rollback)
+        user_message.status = MessageStatus.ERROR
+        user_message.error_code = "Stream aborted by client"
+        failed_at = utcnow()
+        user_message.updated_at = failed_at
+        thread.updated_at = failed_at
+        await asyncio.shield(asyncio.to_thread(session.commit))
+        raise
+
+    # One timestamp for every row touched by the completion keeps them ordered consistently.
+    completed_at = utcnow()
     user_message.status = MessageStatus.READY
     user_message.error_code = None
     usage_prompt = completion.usage.get("prompt_tokens")
@@ -1124,14 +1573,14 @@ async def _process_message_creation(
         user_message.tokens_count = usage_prompt
     if completion.response_id:
         user_message.correlation_id = completion.response_id
-    user_message.updated_at = utcnow()
+    user_message.updated_at = completed_at
 
     assistant_tokens = completion.usage.get("completion_tokens")
     assistant_text = completion.content or ""
     if not assistant_text.strip():
         assistant_text = "(no text content)"
     assistant_message = Message(
-        thread_id=thread.id,
+        thread_id=thread_id,
         sender_id="assistant",
         sender_type=SenderType.ASSISTANT,
         status=MessageStatus.READY,
@@ -1139,6 +1588,8 @@ async def _process_message_creation(
         meta=completion.metadata or {},
         tokens_count=assistant_tokens,
         correlation_id=completion.response_id or None,
+        created_at=completed_at,
+        updated_at=completed_at,
     )
 
     if isinstance(completion.metadata, dict):
@@ -1150,67 +1601,53 @@ async def _process_message_creation(
                 key = attachment.get("storage_filename") or f"{attachment.get('filename')}:{len(provider_attachments_buffer)}"
                 provider_attachments_buffer.setdefault(key, attachment)
 
-    provider_attachment_payloads = list(provider_attachments_buffer.values())
-    if provider_attachment_payloads:
-        _persist_provider_attachments(
-            session=session,
-            message=assistant_message,
-            attachments=provider_attachment_payloads,
-        )
+    provider_attachments = _build_provider_attachments(
+        message=assistant_message,
+        attachments=list(provider_attachments_buffer.values()),
+    )
 
-    if completion.conversation_id:
-        if conversation_state is None:
-            conversation_state = ProviderThreadState(
-                thread_id=thread.id,
+    session.add(assistant_message)
+    thread.updated_at = completed_at
+
+    def persist_completion() -> None:
+        # The conversation-state upsert, attachment insert and commit are all
+        # blocking session I/O; one worker-thread hop covers them together.
+        if completion.conversation_id:
+            _save_conversation_state(
+                session,
+                conversation_state,
+                thread_id=thread_id,
                 provider=provider_key,
                 conversation_id=completion.conversation_id,
-                payload={
-                    "model": completion.model,
-                    "model_label": thread_attributes.get("model_label"),
-                },
+                model=completion.model,
+                model_label=model_label,
+                last_message_id=assistant_message.id,
+                updated_at=completed_at,
             )
-        else:
-            conversation_state.conversation_id = completion.conversation_id
-            current_payload = conversation_state.payload or {}
-            current_payload["model"] = completion.model
-            if thread_attributes.get("model_label"):
-                current_payload["model_label"] = thread_attributes.get("model_label")
-            conversation_state.payload = current_payload
-            conversation_state.updated_at = utcnow()
-        session.add(conversation_state)
-
-    session.add(user_message)
-    session.add(assistant_message)
-    thread.updated_at = utcnow()
-    session.add(thread)
-    session.commit()
-    session.refresh(user_message)
-    session.refresh(assistant_message)
-    session.refresh(thread)
+        if provider_attachments:
+            # Same bulk path as user uploads: one INSERT after the message row.
+            session.flush()
+            session.exec(
+                insert(MessageAttachment),
+                params=[attachment.model_dump() for attachment in provider_attachments],
+            )
+        session.commit()
 
-    if user_message.id not in attachments_map:
-        attachments_map[user_message.id] = new_attachments
+    await asyncio.to_thread(persist_completion)
 
     if search_index is not None:
-        try:
-            await search_index.index_message(
-                message=user_message,
-                thread=thread,
-                model_label=thread_attributes.get("model_label"),
-            )
-            await search_index.index_message(
-                message=assistant_message,
-                thread=thread,
-                model_label=thread_attributes.get("model_label"),
-            )
-        except Exception:  # pragma: no cover - best effort logging
-            logger.exception("Failed to index message %s for semantic search", user_message.id)
+        # Indexing runs after the response is sent; the session does not expire
+        # rows on commit, so they stay readable once it is closed.
+        background_tasks.add_task(
+            _index_messages,
+            search_index,
+            (user_message, assistant_message),
+            thread,
+            model_label,
+        )
 
     user_message_read = MessageRead.model_validate(user_message)
-    user_message_read.attachments = [
-        _attachment_to_read_model(attachment)
-        for attachment in attachments_map.get(user_message.id, [])
-    ]
+    user_message_read.attachments = user_attachments
     return user_message_read
 
 
@@ -1222,25 +1659,64 @@ async def _process_message_creation(
 async def create_message(
     thread_id: UUID,
     payload: MessageCreate,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     current_user: AuthenticatedUser = Depends(get_current_user),
     chat_service: OpenAIChatService = Depends(get_chat_service),
     search_index: SearchIndexService | None = Depends(get_optional_search_index_service),
-) -> MessageRead:
+) -> Response:
     user_id = current_user.user_id
-    thread = _ensure_thread(session, thread_id, user_id)
+    thread = await _ensure_thread_async(session, thread_id, user_id)
     _enforce_metadata_permissions(current_user, thread.attributes)
     payload = payload.model_copy(update={"sender_id": user_id})
-    return await _process_message_creation(
+    message = await _process_message_creation(
         thread=thread,
         payload=payload,
         session=session,
         user_id=user_id,
         chat_service=chat_service,
         search_index=search_index,
+        background_tasks=background_tasks,
+    )
+    return _model_response(message, status_code=status.HTTP_201_CREATED)
+
+
+def _drain_frames(receive_stream: MemoryObjectReceiveStream[bytes], frames: list[bytes]) -> bool:
+    """Move every already-buffered frame into ``frames``; True once the sender closed."""
+    while True:
+        try:
+            frames.append(receive_stream.receive_nowait())
+        except anyio.WouldBlock:
+            return False
+        except anyio.EndOfStream:
+            return True
+
+
+def _sse_frame(payload: dict[str, Any]) -> bytes:
+    # One formatted allocation; chained `+` copies the JSON body twice.
+    return b"data: %b\n\n" % orjson.dumps(payload)
+
+
+def _status_frame_template(agent_status: str, finish_reason: str | None) -> bytes:
+    # Control frames differ only by thread id, so they are encoded once with a
+    # `%s` slot and filled in with `template % thread_key` per request.
+    return _sse_frame(
+        {
+            "id": "%s",
+            "object": "chat.completion.chunk",
+            "agent_status": agent_status,
+            "choices": [{"delta": {}, "finish_reason": finish_reason}],
+        }
     )
 
 
+_QUEUED_FRAME = _status_frame_template("queued", None)
+_RUNNING_FRAME = _status_frame_template("running", None)
+_COMPLETED_FRAME = _status_frame_template("completed", "stop")
+_FAILED_FRAME = _status_frame_template("failed", "error")
+_INTERNAL_ERROR_FRAME = _sse_frame({"error": {"message": "Internal server error", "type": "internal_error"}})
+
+
 @router.post(
     "/{thread_id}/messages/stream",
     response_class=StreamingResponse,
@@ -1248,23 +1724,30 @@ async def create_message(
 async def stream_message(
     thread_id: UUID,
     payload: MessageCreate,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     current_user: AuthenticatedUser = Depends(get_current_user),
     chat_service: OpenAIChatService = Depends(get_chat_service),
     search_index: SearchIndexService | None = Depends(get_optional_search_index_service),
 ) -> StreamingResponse:
     user_id = current_user.user_id
-    thread = _ensure_thread(session, thread_id, user_id)
+    thread = await _ensure_thread_async(session, thread_id, user_id)
     _enforce_metadata_permissions(current_user, thread.attributes)
     payload = payload.model_copy(update={"sender_id": user_id})
-    queue: asyncio.Queue[str | None] = asyncio.Queue()
-    last_status: dict[str, str | None] = {"value": None}
+    thread_key = str(thread_id).encode("ascii")
+    running_frame = _RUNNING_FRAME % thread_key
+    # Bounded, so a slow client applies backpressure to the agent stream.
+    send_stream, receive_stream = anyio.create_memory_object_stream(max_buffer_size=_SSE_BUFFER_SIZE)
+    last_status: dict[str, str | None] = {"value": "running"}
+    coalesce_window = get_settings().sse_coalesce_window_seconds
 
     async def forward_chunk(chunk: dict[str, object]) -> None:
         status = chunk.get("agent_status")
         if isinstance(status, str):
             last_status["value"] = status.lower()
-        await queue.put(json.dumps(chunk, separators=(",", ":")))
+        await send_stream.send(_sse_frame(chunk))
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         metadata = chunk.get("message_metadata")
         attachments_preview: list[dict[str, Any]] = []
         if isinstance(metadata, dict):
@@ -1280,155 +1763,108 @@ async def stream_message(
                             }
                         )
         text_preview = _truncate(_extract_chunk_text(chunk), 160)
-        logger.info(
+        logger.debug(
             "Forwarded agent chunk to client: thread_id=%s status=%s text_preview=%s attachments=%s",
-            thread.id,
+            thread_id,
             status or last_status["value"] or "n/a",
             text_preview,
             attachments_preview,
         )
 
-    initial_chunk = {
-        "id": str(thread_id),
-        "object": "chat.completion.chunk",
-        "agent_status": "queued",
-        "choices": [
-            {
-                "delta": {},
-                "finish_reason": None,
-            }
-        ],
-    }
-    await queue.put(json.dumps(initial_chunk, separators=(",", ":")))
-    last_status["value"] = "queued"
+    async def send_final(*frames: bytes) -> None:
+        # The consumer may already be gone; there is nobody left to tell then.
+        with contextlib.suppress(anyio.BrokenResourceError):
+            for frame in frames:
+                await send_stream.send(frame)
 
     async def worker() -> None:
-        heartbeat_interval_seconds = 10.0
-        stop_heartbeat = asyncio.Event()
-        running_chunk_json = json.dumps(
-            {
-                "id": str(thread_id),
-                "object": "chat.completion.chunk",
-                "agent_status": "running",
-                "choices": [
-                    {
-                        "delta": {},
-                        "finish_reason": None,
-                    }
-                ],
-            },
-            separators=(",", ":"),
-        )
-
-        async def heartbeat_loop() -> None:
+        # Closing the send side ends the consumer's stream; no sentinel needed.
+        async with send_stream:
             try:
-                while True:
-                    await asyncio.sleep(heartbeat_interval_seconds)
-                    if stop_heartbeat.is_set():
-                        break
-                    await queue.put(running_chunk_json)
+                await _process_message_creation(
+                    thread=thread,
+                    payload=payload,
+                    session=session,
+                    user_id=user_id,
+                    chat_service=chat_service,
+                    search_index=search_index,
+                    background_tasks=background_tasks,
+                    chunk_callback=forward_chunk,
+                )
+                if last_status["value"] not in _TERMINAL_AGENT_STATUSES:
+                    last_status["value"] = "completed"
+                    await send_final(_COMPLETED_FRAME % thread_key)
+            except anyio.BrokenResourceError:
+                # The response body closed its end; the message was already marked failed.
+                last_status["value"] = "failed"
+            except HTTPException as exc:
+                last_status["value"] = "failed"
+                await send_final(
+                    _FAILED_FRAME % thread_key,
+                    _sse_frame({"error": {"message": exc.detail, "type": "agent_error"}}),
+                )
             except asyncio.CancelledError:
                 raise
-
-        heartbeat_task: asyncio.Task | None = None
-        try:
-            await queue.put(running_chunk_json)
-            last_status["value"] = "running"
-            heartbeat_task = asyncio.create_task(heartbeat_loop())
-            await _process_message_creation(
-                thread=thread,
-                payload=payload,
-                session=session,
-                user_id=user_id,
-                chat_service=chat_service,
-                search_index=search_index,
-                chunk_callback=forward_chunk,
-            )
-            if last_status["value"] not in {"completed", "interrupted"}:
-                completion_chunk = {
-                    "id": str(thread_id),
-                    "object": "chat.completion.chunk",
-                    "agent_status": "completed",
-                    "choices": [
-                        {
-                            "delta": {},
-                            "finish_reason": "stop",
-                        }
-                    ],
-                }
-                await queue.put(json.dumps(completion_chunk, separators=(",", ":")))
-        except HTTPException as exc:
-            failure_chunk = {
-                "id": str(thread_id),
-                "object": "chat.completion.chunk",
-                "agent_status": "failed",
-                "choices": [
-                    {
-                        "delta": {},
-                        "finish_reason": "error",
-                    }
-                ],
-            }
-            await queue.put(json.dumps(failure_chunk, separators=(",", ":")))
-            await queue.put(
-                json.dumps(
-                    {"error": {"message": exc.detail, "type": "agent_error"}},
-                    separators=(",", ":"),
-                )
-            )
-            last_status["value"] = "failed"
-        except asyncio.CancelledError:
-            raise
-        except Exception:  # pragma: no cover - defensive logging
-            logger.exception(
-                "Unexpected error while streaming completion: thread_id=%s user_id=%s",
-                thread.id,
-                user_id,
-            )
-            failure_chunk = {
-                "id": str(thread_id),
-                "object": "chat.completion.chunk",
-                "agent_status": "failed",
-                "choices": [
-                    {
-                        "delta": {},
-                        "finish_reason": "error",
-                    }
-                ],
-            }
-            await queue.put(json.dumps(failure_chunk, separators=(",", ":")))
-            await queue.put(
-                json.dumps(
-                    {"error": {"message": "Internal server error", "type": "internal_error"}},
-                    separators=(",", ":"),
+            except Exception:  # pragma: no cover - defensive logging
+                logger.exception(
+                    "Unexpected error while streaming completion: thread_id=%s user_id=%s",
+                    thread_id,
+                    user_id,
                 )
-            )
-            last_status["value"] = "failed"
-        finally:
-            stop_heartbeat.set()
-            if heartbeat_task is not None:
-                heartbeat_task.cancel()
-                with contextlib.suppress(asyncio.CancelledError):
-                    await heartbeat_task
-            await queue.put(None)
+                last_status["value"] = "failed"
+                await send_final(_FAILED_FRAME % thread_key, _INTERNAL_ERROR_FRAME)
 
-    task = asyncio.create_task(worker())
+    def heartbeat() -> None:
+        # Called by the shared ticker between frames; never after a terminal status,
+        # and skipped when the buffer is full since real frames are already pending.
+        if last_status["value"] in _TERMINAL_AGENT_STATUSES:
+            return
+        with contextlib.suppress(anyio.WouldBlock, anyio.ClosedResourceError, anyio.BrokenResourceError):
+            send_stream.send_nowait(running_frame)
 
     async def event_generator():
+        task: asyncio.Task[None] | None = None
         try:
-            while True:
-                item = await queue.get()
-                if item is None:
-                    yield "data: [DONE]\n\n"
-                    break
-                yield f"data: {item}\n\n"
+            yield _QUEUED_FRAME % thread_key
+            # Started from the body, so the worker only exists while a client is
+            # attached and this generator's teardown is what stops it.
+            task = asyncio.create_task(worker())
+            yield running_frame
+            _sse_heartbeats.subscribe(heartbeat)
+            async with receive_stream:
+                closed = False
+                while not closed:
+                    # Frames that piled up while the client was slow go out as one write.
+                    frames: list[bytes] = []
+                    closed = _drain_frames(receive_stream, frames)
+                    if not frames and not closed:
+                        # No per-wait timeout: heartbeats arrive through the stream
+                        # like any other frame, so tokens never arm and cancel timers.
+                        try:
+                            frames.append(await receive_stream.receive())
+                        except anyio.EndOfStream:
+                            break
+                        if coalesce_window > 0:
+                            # Give the rest of a token burst a moment to share the write.
+                            await anyio.sleep(coalesce_window)
+                            closed = _drain_frames(receive_stream, frames)
+                    if frames:
+                        yield b"".join(frames)
+            yield _SSE_DONE_FRAME
         finally:
-            if not task.done():
+            _sse_heartbeats.unsubscribe(heartbeat)
+            if task is not None and not task.done():
                 task.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
                     await task
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    # Indexing tasks are queued by the worker while streaming and run once the body is sent.
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+        background=background_tasks,
+    )
 
 
 @router.patch(
@@ -1473,7 +1909,6 @@ def update_message(
         message.updated_at = utcnow()
         session.add(message)
         session.commit()
-        session.refresh(message)
 
     return MessageRead.model_validate(message)
 def _pisa_link_callback(uri: str, rel: str) -> str:
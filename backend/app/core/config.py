@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,6 +10,11 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_prefix="CHAT_", extra="ignore")
 
     database_url: str = "sqlite:///./app.db"
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle_seconds: int = 1800
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_pre_ping: bool = True
     app_name: str = "GWP Chat Backend"
     api_prefix: str = "/api"
     llm_enabled: bool = True
@@ -20,6 +26,12 @@ class Settings(BaseSettings):
     llm_api_key: str | None = None
     llm_timeout_seconds: float = 30.0
     llm_trace_enabled: bool = True
+    llm_models_cache_ttl_seconds: float = 300.0
+    llm_history_window: int = 0
+    llm_incremental_prompts: bool = False
+    prompt_attachment_cache_size: int = 128
+    prompt_attachment_cache_ttl_seconds: float = 600.0
+    sse_coalesce_window_seconds: float = 0.0
     search_enabled: bool = True
     embedding_model_name: str = "intfloat/multilingual-e5-large"
     embedding_batch_size: int = 8
@@ -28,6 +40,9 @@ class Settings(BaseSettings):
     search_min_similarity: float = 0.3
     log_level: str = "WARNING"
     attachments_storage_dir: str = "./storage"
+    attachments_accel_redirect_prefix: str | None = None
+    attachments_max_upload_bytes: int = 20 * 1024 * 1024
+    pdf_export_renderer: Literal["markdown_pdf", "weasyprint"] = "markdown_pdf"
     jwt_secret_key: str = "change-me"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 15
@@ -35,6 +50,9 @@ class Settings(BaseSettings):
     jwt_issuer: str = "gwp-chat"
     jwt_audience: str | None = None
     bcrypt_rounds: int = 12
+    token_cache_size: int = 10_000
+    auth_user_cache_size: int = 50_000
+    auth_user_cache_ttl_seconds: float = 2.0
 
     @property
     def llm_base_url(self) -> str:
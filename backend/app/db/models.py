@@ -5,7 +5,7 @@ from enum import Enum
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, JSON, UniqueConstraint, LargeBinary
+from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, Index, JSON, UniqueConstraint, LargeBinary, text
 from sqlmodel import Field, SQLModel
 
 
@@ -59,6 +59,17 @@ class Thread(SQLModel, table=True):
     """Chat thread owned by an end user."""
 
     __tablename__ = "threads"
+    # The thread list reads one owner's live threads newest-first; the partial
+    # predicate matches how `is_deleted.is_(False)` renders on each dialect.
+    __table_args__ = (
+        Index(
+            "ix_threads_owner_active_created_at",
+            "owner_id",
+            "created_at",
+            sqlite_where=text("is_deleted IS 0"),
+            postgresql_where=text("is_deleted IS false"),
+        ),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     owner_id: str = Field(index=True, max_length=128)
@@ -78,6 +89,8 @@ class Message(SQLModel, table=True):
     """Individual message exchanged inside a thread."""
 
     __tablename__ = "messages"
+    # History and message pages filter by thread and order by creation time.
+    __table_args__ = (Index("ix_messages_thread_id_created_at", "thread_id", "created_at"),)
 
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     thread_id: UUID = Field(
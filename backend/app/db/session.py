@@ -1,12 +1,30 @@
 from collections.abc import Iterator
 
+from sqlalchemy.engine import make_url
 from sqlmodel import Session, SQLModel, create_engine
 
 from app.core.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, echo=False)
+
+def _engine_options(database_url: str) -> dict[str, object]:
+    """Pool tuning for every pooled database; in-memory SQLite keeps its single-connection pool."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    ):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+
+
+engine = create_engine(settings.database_url, echo=False, **_engine_options(settings.database_url))
 
 
 def init_db() -> None:
@@ -17,6 +35,10 @@ def init_db() -> None:
 
 
 def get_session() -> Iterator[Session]:
-    """FastAPI dependency that provides a database session."""
-    with Session(engine) as session:
+    """FastAPI dependency that provides a database session.
+
+    Attributes stay loaded after commit: every column value is assigned in Python,
+    so re-selecting rows just to read back what was written is wasted round-trips.
+    """
+    with Session(engine, expire_on_commit=False) as session:
         yield session
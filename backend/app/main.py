@@ -3,7 +3,7 @@ import logging
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from app.api.routes.attachments import router as attachments_router
 from app.api.routes.auth import router as auth_router
@@ -13,6 +13,7 @@ from app.api.routes.search import router as search_router
 from app.api.routes.threads import router as threads_router
 from app.core.config import get_settings
 from app.db.session import init_db
+from app.services.auth import AuthService
 from app.services.embeddings import EmbeddingService
 from app.services.llm import OpenAIChatService
 from app.services.search_index import SearchIndexService
@@ -47,6 +48,7 @@ configure_logging(settings.log_level)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    app.state.auth_service = AuthService(settings)
     llm_service: OpenAIChatService | None = None
     embedding_service: EmbeddingService | None = None
     vector_store_service: VectorStoreService | None = None
@@ -59,6 +61,7 @@ async def lifespan(app: FastAPI):
             trace_enabled=settings.llm_trace_enabled,
             attachments_storage_dir=settings.attachments_storage_dir,
             attachments_download_endpoint=f"{settings.api_prefix}/attachments",
+            models_cache_ttl_seconds=settings.llm_models_cache_ttl_seconds,
         )
         app.state.llm_service = llm_service
     else:
@@ -98,9 +101,10 @@ async def lifespan(app: FastAPI):
             app.state.vector_store_service = None
         if embedding_service is not None:
             app.state.embedding_service = None
+        app.state.auth_service = None
 
 
-app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app = FastAPI(title=settings.app_name, lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -112,6 +116,7 @@ app.add_middleware(
 
 
 http_logger = logging.getLogger("app.http")
+_MAX_LOGGED_BODY_BYTES = 64 * 1024
 
 
 def _truncate_log_value(value: str, limit: int = 128) -> str:
@@ -120,28 +125,47 @@ def _truncate_log_value(value: str, limit: int = 128) -> str:
     return f"{value[:limit]}...(truncated)"
 
 
+def _has_small_body(request: Request) -> bool:
+    # Chunked uploads carry no length; treat them as too large to buffer.
+    content_length = request.headers.get("content-length")
+    return content_length is not None and content_length.isdigit() and int(content_length) <= _MAX_LOGGED_BODY_BYTES
+
+
 @app.middleware("http")
 async def log_http_traffic(request: Request, call_next):
     """
     Log incoming HTTP requests and outgoing responses, including streaming responses.
     """
-    body_bytes = await request.body()
-    body_text = body_bytes.decode("utf-8", errors="ignore")
-    headers_in = dict(request.headers)
+    if http_logger.isEnabledFor(logging.DEBUG) and _has_small_body(request):
+        # Starlette caches the body it reads here, so the route can read it again.
+        body_bytes = await request.body()
+        http_logger.debug(
+            "Incoming request: method=%s url=%s headers=%s body=%s",
+            request.method,
+            request.url,
+            dict(request.headers),
+            _truncate_log_value(body_bytes.decode("utf-8", errors="ignore")),
+        )
+    elif http_logger.isEnabledFor(logging.INFO):
+        # Bodies (attachments, prompts) are never buffered just to be logged.
+        http_logger.info(
+            "Incoming request: method=%s url=%s headers=%s",
+            request.method,
+            request.url,
+            dict(request.headers),
+        )
+
+    response = await call_next(request)
+    if not http_logger.isEnabledFor(logging.INFO):
+        return response
     http_logger.info(
-        "Incoming request: method=%s url=%s headers=%s body=%s",
-        request.method,
-        str(request.url),
-        headers_in,
-        _truncate_log_value(body_text),
+        "Outgoing response: status=%s headers=%s",
+        response.status_code,
+        dict(response.headers),
     )
-
-    async def receive() -> dict[str, object]:
-        return {"type": "http.request", "body": body_bytes, "more_body": False}
-
-    wrapped_request = Request(request.scope, receive)
-    response = await call_next(wrapped_request)
-    headers_out = dict(response.headers)
+    if not http_logger.isEnabledFor(logging.DEBUG):
+        # Bodies pass through untouched; SSE chunks are not decoded per token.
+        return response
 
     is_streaming = hasattr(response, "body_iterator") and not hasattr(response, "body")
 
@@ -150,12 +174,13 @@ async def log_http_traffic(request: Request, call_next):
 
         async def logging_iterator():
             async for chunk in original_iterator:
+                # Only the logged prefix is decoded; coalesced SSE writes can be large.
                 chunk_text = (
-                    chunk.decode("utf-8", errors="ignore")
+                    chunk[:1024].decode("utf-8", errors="ignore")
                     if isinstance(chunk, (bytes, bytearray))
                     else str(chunk)
                 )
-                http_logger.info(
+                http_logger.debug(
                     "Outgoing streaming response chunk: status=%s chunk=%s",
                     response.status_code,
                     _truncate_log_value(chunk_text),
@@ -163,22 +188,15 @@ async def log_http_traffic(request: Request, call_next):
                 yield chunk
 
         response.body_iterator = logging_iterator()
-        http_logger.info(
-            "Outgoing streaming response: status=%s headers=%s",
-            response.status_code,
-            headers_out,
-        )
         return response
 
     body_out = getattr(response, "body", b"") or b""
     if not isinstance(body_out, (bytes, bytearray)):
         body_out = str(body_out).encode("utf-8")
-    body_out_text = body_out.decode("utf-8", errors="ignore")
-    http_logger.info(
-        "Outgoing response: status=%s headers=%s body=%s",
+    http_logger.debug(
+        "Outgoing response body: status=%s body=%s",
         response.status_code,
-        headers_out,
-        _truncate_log_value(body_out_text),
+        _truncate_log_value(body_out[:1024].decode("utf-8", errors="ignore")),
     )
     return response
 
@@ -25,7 +25,7 @@ class TokenResponse(BaseModel):
 
 
 class TokenPayload(BaseModel):
-    sub: str
+    sub: UUID
     username: str
     type: str
     exp: int
@@ -39,7 +39,7 @@ class TokenPayload(BaseModel):
     agents: list[str] = Field(default_factory=list)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AuthenticatedUser:
     id: UUID
     username: str
@@ -49,9 +49,12 @@ class AuthenticatedUser:
     token_version: int = 1
 
     def __post_init__(self) -> None:  # type: ignore[override]
-        object.__setattr__(self, "roles", tuple(self.roles))
-        object.__setattr__(self, "allowed_products", frozenset(self.allowed_products))
-        object.__setattr__(self, "allowed_agents", frozenset(self.allowed_agents))
+        if type(self.roles) is not tuple:
+            object.__setattr__(self, "roles", tuple(self.roles))
+        if type(self.allowed_products) is not frozenset:
+            object.__setattr__(self, "allowed_products", frozenset(self.allowed_products))
+        if type(self.allowed_agents) is not frozenset:
+            object.__setattr__(self, "allowed_agents", frozenset(self.allowed_agents))
 
     @property
     def user_id(self) -> str:
@@ -8,9 +8,10 @@ T = TypeVar("T")
 
 class Pagination(BaseModel):
     total: int
-    page: int = Field(ge=1)
+    page: int | None = Field(default=None, ge=1)
     limit: int = Field(ge=1)
     has_more: bool
+    next_cursor: str | None = None
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 from pydantic import ConfigDict, field_validator, model_validator
 
 from app.db.models import MessageStatus, SenderType
+from app.schemas.common import PaginatedResponse
 
 
 ERROR_CODE_MAX_LENGTH = 128
@@ -97,3 +98,5 @@ class MessageAttachmentRead(MessageAttachmentBase):
 
 MessageCreate.model_rebuild()
 MessageRead.model_rebuild()
+
+MessageListResponse = PaginatedResponse[MessageRead]
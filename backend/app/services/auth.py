@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import bcrypt
 import jwt
 from jwt import InvalidTokenError
+from pydantic import ValidationError
 
 from app.core.config import Settings, get_settings
 from app.db.models import User
 from app.schemas.auth import TokenPayload
+from app.utils.cache import TTLCache
 
 
 class AuthenticationError(Exception):
@@ -23,6 +27,9 @@ class AuthService:
         self._settings = settings or get_settings()
         rounds = int(self._settings.bcrypt_rounds)
         self._bcrypt_rounds = max(4, min(rounds, 31))
+        self._decoded_tokens: TTLCache[bytes, TokenPayload] = TTLCache(
+            maxsize=self._settings.token_cache_size,
+        )
 
     @property
     def access_token_expires_seconds(self) -> int:
@@ -89,6 +96,13 @@ class AuthService:
         )
 
     def _decode_token(self, token: str, *, expected_type: str) -> TokenPayload:
+        cache_key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        cached = self._decoded_tokens.get(cache_key)
+        if cached is not None:
+            if cached.type != expected_type:
+                raise AuthenticationError("Unexpected token type")
+            return cached
+
         options = {"require": ["exp", "iat", "nbf", "sub", "type", "token_version"]}
         decode_kwargs: dict[str, Any] = {
             "key": self._settings.jwt_secret_key,
@@ -104,7 +118,13 @@ class AuthService:
         except InvalidTokenError as exc:
             raise AuthenticationError("Failed to validate token") from exc
 
-        payload = TokenPayload.model_validate(raw_payload)
+        try:
+            payload = TokenPayload.model_validate(raw_payload)
+        except ValidationError as exc:
+            raise AuthenticationError("Malformed token payload") from exc
+        # Signature and claims are verified; reuse the payload until the token expires.
+        # Revocation is still enforced by comparing token_version against the user row.
+        self._decoded_tokens.set(cache_key, payload, ttl=payload.exp - time.time())
         if payload.type != expected_type:
             raise AuthenticationError("Unexpected token type")
         return payload
@@ -3,16 +3,19 @@ from __future__ import annotations
 import asyncio
 import base64
 import binascii
+import contextlib
 import inspect
 import json
 import logging
 import re
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Awaitable, Callable, Literal, Sequence
 from uuid import uuid4
 
 import httpx
+import orjson
 
 
 class LLMServiceError(RuntimeError):
@@ -82,6 +85,7 @@ class OpenAIChatService:
         trace_enabled: bool = True,
         attachments_storage_dir: str | Path | None = None,
         attachments_download_endpoint: str | None = None,
+        models_cache_ttl_seconds: float = 300.0,
     ) -> None:
         headers: dict[str, str] = {}
         if api_key:
@@ -109,6 +113,9 @@ class OpenAIChatService:
         self._attachments_endpoint = (
             attachments_download_endpoint.rstrip("/") if attachments_download_endpoint else None
         )
+        self._models_cache_ttl = max(0.0, models_cache_ttl_seconds)
+        self._models_cache: tuple[float, list[ProviderModelCard]] | None = None
+        self._models_refresh_task: asyncio.Task[None] | None = None
         self._trace("Trace logging enabled for OpenAIChatService base_url=%s", self._client.base_url)
 
     async def create_completion(
@@ -149,36 +156,37 @@ class OpenAIChatService:
             len(messages),
         )
         self._log_request("chat.completions", payload)
-        safe_headers = dict(self._client.headers)
-        if "Authorization" in safe_headers:
-            safe_headers["Authorization"] = "***redacted***"
-        
-        # Redact attachment payloads before logging
-        redacted_messages: list[dict[str, Any]] = []
-        for message in payload.get("messages", []):
-            redacted_parts: list[Any] = []
-            for part in message.get("content", []):
-                if isinstance(part, dict):
-                    part_copy = dict(part)
-                    data_value = part_copy.get("data")
-                    if isinstance(data_value, str):
-                        part_copy["data"] = data_value[:64]
-                    elif "data" in part_copy:
-                        part_copy["data"] = data_value
-                    redacted_parts.append(part_copy)
-                else:
-                    redacted_parts.append(part)
-            message_copy = dict(message)
-            message_copy["content"] = redacted_parts
-            redacted_messages.append(message_copy)
+        if logger.isEnabledFor(logging.INFO):
+            safe_headers = dict(self._client.headers)
+            if "Authorization" in safe_headers:
+                safe_headers["Authorization"] = "***redacted***"
 
-        redacted_payload = {**payload, "messages": redacted_messages}
-        logger.info(
-            "OpenAI request dispatched: method=POST url=%s headers=%s payload=%s",
-            str(self._client.base_url.join("chat/completions")),
-            safe_headers,
-            json.dumps(redacted_payload, ensure_ascii=False),
-        )
+            # Redact attachment payloads before logging
+            redacted_messages: list[dict[str, Any]] = []
+            for message in payload.get("messages", []):
+                redacted_parts: list[Any] = []
+                for part in message.get("content", []):
+                    if isinstance(part, dict):
+                        part_copy = dict(part)
+                        data_value = part_copy.get("data")
+                        if isinstance(data_value, str):
+                            part_copy["data"] = data_value[:64]
+                        elif "data" in part_copy:
+                            part_copy["data"] = data_value
+                        redacted_parts.append(part_copy)
+                    else:
+                        redacted_parts.append(part)
+                message_copy = dict(message)
+                message_copy["content"] = redacted_parts
+                redacted_messages.append(message_copy)
+
+            redacted_payload = {**payload, "messages": redacted_messages}
+            logger.info(
+                "OpenAI request dispatched: method=POST url=%s headers=%s payload=%s",
+                str(self._client.base_url.join("chat/completions")),
+                safe_headers,
+                orjson.dumps(redacted_payload).decode(),
+            )
 
         try:
             if stream:
@@ -229,17 +237,21 @@ class OpenAIChatService:
                     parser = _StreamingCompletionParser(
                         default_model=model,
                         status_callback=on_status,
-                        trace_callback=self._trace if self._trace_enabled else None,
+                        trace_callback=self._trace if self._tracing() else None,
                     )
+                    # Trace arguments are built eagerly; skip them per line unless tracing.
+                    trace_lines = self._tracing()
                     async for line in response.aiter_lines():
-                        self._trace("Streaming raw line: %s", self._truncate_text(line, 500))
+                        if trace_lines:
+                            self._trace("Streaming raw line: %s", self._truncate_text(line, 500))
                         if not line or line.startswith(":"):
                             continue
                         if not line.startswith("data:"):
                             continue
                         payload_line = line[5:].strip()
                         logger.info("OpenAI streaming chunk received: %s", payload_line)
-                        self._trace("Streaming payload line: %s", self._truncate_text(payload_line, 500))
+                        if trace_lines:
+                            self._trace("Streaming payload line: %s", self._truncate_text(payload_line, 500))
                         if not payload_line:
                             continue
                         if payload_line == "[DONE]":
@@ -441,6 +453,39 @@ class OpenAIChatService:
         return result
 
     async def list_models(self) -> list[ProviderModelCard]:
+        cached = self._models_cache
+        if cached is not None:
+            fetched_at, cards = cached
+            age = time.monotonic() - fetched_at
+            if age < self._models_cache_ttl:
+                if age >= self._models_cache_ttl / 2:
+                    self._schedule_models_refresh()
+                return list(cards)
+        return await self._refresh_models()
+
+    async def _refresh_models(self) -> list[ProviderModelCard]:
+        cards = await self._fetch_models()
+        if self._models_cache_ttl > 0:
+            self._models_cache = (time.monotonic(), cards)
+        return list(cards)
+
+    def _schedule_models_refresh(self) -> None:
+        # Stale-while-revalidate: serve the cached catalog and refresh it in the background.
+        if self._models_refresh_task is not None and not self._models_refresh_task.done():
+            return
+        self._models_refresh_task = asyncio.create_task(self._refresh_models_in_background())
+
+    async def _refresh_models_in_background(self) -> None:
+        try:
+            await self._refresh_models()
+        except LLMServiceError:
+            logger.warning("Background refresh of the models catalog failed; keeping cached list")
+        except Exception:
+            # Nothing awaits this task, so anything escaping would only surface as
+            # "Task exception was never retrieved".
+            logger.exception("Unexpected error refreshing the models catalog; keeping cached list")
+
+    async def _fetch_models(self) -> list[ProviderModelCard]:
         logger.info("Requesting OpenAI-compatible models catalog")
         try:
             response = await self._client.get("models")
@@ -533,6 +578,10 @@ class OpenAIChatService:
         return cards
 
     async def aclose(self) -> None:
+        if self._models_refresh_task is not None and not self._models_refresh_task.done():
+            self._models_refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._models_refresh_task
         await self._client.aclose()
 
     @staticmethod
@@ -620,13 +669,18 @@ class OpenAIChatService:
             "extra": extra or None,
         }
 
+    def _tracing(self) -> bool:
+        # Trace records are emitted at INFO; under the default WARNING level they
+        # would be dropped anyway, so skip building their arguments.
+        return self._trace_enabled and logger.isEnabledFor(self._trace_level)
+
     def _trace(self, message: str, *args: Any) -> None:
-        if not self._trace_enabled:
+        if not self._tracing():
             return
         logger.log(self._trace_level, "[TRACE] " + message, *args)
 
     def _trace_json(self, label: str, data: Any, *, max_length: int = 2000) -> None:
-        if not self._trace_enabled:
+        if not self._tracing():
             return
         serialised = self._serialise_for_log(data, max_length=max_length)
         logger.log(self._trace_level, "[TRACE] %s: %s", label, serialised)
@@ -636,8 +690,9 @@ class OpenAIChatService:
         if isinstance(data, bytes):
             text = data[: max_length].decode("utf-8", "replace")
         else:
+            # Runs per streamed chunk when tracing is on; orjson keeps that cheap.
             try:
-                text = json.dumps(data, default=str, ensure_ascii=True)
+                text = orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
             except (TypeError, ValueError):
                 text = str(data)
         return OpenAIChatService._truncate_text(text, max_length)
@@ -884,8 +939,8 @@ class _StreamingCompletionParser:
 
     def parse_json(self, payload_line: str) -> dict[str, Any] | None:
         try:
-            return json.loads(payload_line)
-        except json.JSONDecodeError:
+            return orjson.loads(payload_line)
+        except orjson.JSONDecodeError:
             logger.warning("Discarding malformed streaming payload: %s", payload_line)
         return None
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from typing import Iterable
 
@@ -88,7 +89,8 @@ class SearchIndexService:
                 distance_threshold=None,
                 min_similarity=self._min_similarity,
             )
-        result = self._vector_store.query(
+        result = await asyncio.to_thread(
+            self._vector_store.query,
             embedding=embeddings[0],
             owner_id=user_id,
             model_id=model_id,
@@ -1,9 +1,11 @@
+import asyncio
 import inspect
 import os
 from pathlib import Path
 from uuid import UUID
 
 import pytest
+from fastapi import BackgroundTasks
 from fastapi.testclient import TestClient
 
 # Configure isolated database before importing the app modules.
@@ -16,12 +18,16 @@ os.environ.setdefault("CHAT_SEARCH_ENABLED", "false")
 
 from app.main import app  # noqa: E402
 from app.db.session import engine  # noqa: E402
+from app.api.routes.search import _compile_pattern, _regex_fallback  # noqa: E402
+from app.api.routes.threads import stream_message  # noqa: E402
 from app.api.deps import get_chat_service, get_optional_search_index_service, get_search_index_service  # noqa: E402
 from app.services.llm import ChatCompletionResult, LLMServiceError, ProviderModelCard  # noqa: E402
 from app.services.search_index import SearchMatch, SearchResultSet  # noqa: E402
 from sqlmodel import Session, select  # noqa: E402
 from app.db.models import Message, MessageStatus, SenderType, User  # noqa: E402
 from app.services.auth import AuthService  # noqa: E402
+from app.schemas.auth import AuthenticatedUser  # noqa: E402
+from app.schemas.message import MessageCreate  # noqa: E402
 from app.core.config import get_settings  # noqa: E402
 
 
@@ -146,6 +152,38 @@ class InterruptStubLLM:
         return [ProviderModelCard(id="stub-model", name="Stub Model")]
 
 
+class EndlessStubLLM:
+    def __init__(self):
+        self.streaming = asyncio.Event()
+        self.cancelled = False
+
+    async def create_completion(
+        self,
+        *,
+        model: str,
+        messages,
+        user=None,
+        conversation_id=None,
+        stream=False,
+        on_status=None,
+        on_chunk=None,
+    ):
+        chunk_payload = {
+            "agent_status": "streaming",
+            "choices": [{"delta": {"content": [{"type": "output_text", "text": "tick"}]}}],
+        }
+        try:
+            while True:
+                await on_chunk(chunk_payload)
+                self.streaming.set()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    async def list_models(self):  # pragma: no cover
+        return [ProviderModelCard(id="stub-model", name="Stub Model")]
+
+
 class StubSearchIndex:
     def __init__(self):
         self.messages: dict[str, dict[str, str | None]] = {}
@@ -448,6 +486,107 @@ def test_first_message_sets_default_title():
         engine.dispose()
 
 
+def test_follow_up_message_keeps_existing_title():
+    stub = SuccessfulStubLLM()
+    app.dependency_overrides[get_chat_service] = lambda: stub
+    try:
+        with TestClient(app) as client:
+            user = authenticate_client(client)
+            create_resp = client.post("/api/threads", json={"title": "Planning"})
+            assert create_resp.status_code == 201
+            thread_id = create_resp.json()["id"]
+
+            for text in ("First question", "Second question"):
+                message_payload = {
+                    "text": text,
+                    "user_id": str(user.id),
+                    "model": "stub-model",
+                    "model_label": "Stub Model",
+                }
+                post_resp = client.post(f"/api/threads/{thread_id}/messages", json=message_payload)
+                assert post_resp.status_code == 201
+
+            detail_resp = client.get(f"/api/threads/{thread_id}")
+            assert detail_resp.status_code == 200
+            assert detail_resp.json()["title"] == "Stub Model: First question"
+    finally:
+        app.dependency_overrides.pop(get_chat_service, None)
+        engine.dispose()
+
+
+def test_list_messages_pagination_totals():
+    stub = SuccessfulStubLLM()
+    app.dependency_overrides[get_chat_service] = lambda: stub
+    try:
+        with TestClient(app) as client:
+            user = authenticate_client(client)
+            create_resp = client.post("/api/threads", json={"title": "Paged"})
+            thread_id = create_resp.json()["id"]
+            for text in ("First", "Second"):
+                message_payload = {"text": text, "user_id": str(user.id), "model": "stub-model"}
+                post_resp = client.post(f"/api/threads/{thread_id}/messages", json=message_payload)
+                assert post_resp.status_code == 201
+
+            first_page = client.get(f"/api/threads/{thread_id}/messages", params={"limit": 3}).json()
+            assert len(first_page["items"]) == 3
+            assert first_page["pagination"]["total"] == 4
+            assert first_page["pagination"]["has_more"] is True
+
+            last_page = client.get(f"/api/threads/{thread_id}/messages", params={"limit": 3, "page": 2}).json()
+            assert len(last_page["items"]) == 1
+            assert last_page["pagination"]["total"] == 4
+            assert last_page["pagination"]["has_more"] is False
+
+            past_end = client.get(f"/api/threads/{thread_id}/messages", params={"limit": 3, "page": 5}).json()
+            assert past_end["items"] == []
+            assert past_end["pagination"]["total"] == 4
+
+            cursor = first_page["pagination"]["next_cursor"]
+            assert cursor
+            cursor_page = client.get(
+                f"/api/threads/{thread_id}/messages", params={"limit": 3, "cursor": cursor}
+            ).json()
+            assert [item["id"] for item in cursor_page["items"]] == [item["id"] for item in last_page["items"]]
+            assert cursor_page["pagination"]["total"] == 4
+            assert cursor_page["pagination"]["page"] is None
+            assert cursor_page["pagination"]["has_more"] is False
+            assert cursor_page["pagination"]["next_cursor"] is None
+
+            bad_cursor = client.get(f"/api/threads/{thread_id}/messages", params={"cursor": "not-a-cursor"})
+            assert bad_cursor.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_chat_service, None)
+        engine.dispose()
+
+
+def test_thread_reads_revalidate_with_etag():
+    stub = SuccessfulStubLLM()
+    app.dependency_overrides[get_chat_service] = lambda: stub
+    try:
+        with TestClient(app) as client:
+            user = authenticate_client(client)
+            thread_id = client.post("/api/threads", json={"title": "Cached"}).json()["id"]
+            message_payload = {"text": "Hello", "user_id": str(user.id), "model": "stub-model"}
+            assert client.post(f"/api/threads/{thread_id}/messages", json=message_payload).status_code == 201
+
+            for url in (f"/api/threads/{thread_id}", f"/api/threads/{thread_id}/messages"):
+                first = client.get(url)
+                assert first.status_code == 200
+                etag = first.headers["etag"]
+                cached = client.get(url, headers={"If-None-Match": etag})
+                assert cached.status_code == 304
+                assert cached.headers["etag"] == etag
+
+            detail_etag = client.get(f"/api/threads/{thread_id}").headers["etag"]
+            assert client.post(f"/api/threads/{thread_id}/messages", json=message_payload).status_code == 201
+            refreshed = client.get(f"/api/threads/{thread_id}", headers={"If-None-Match": detail_etag})
+            assert refreshed.status_code == 200
+            assert refreshed.headers["etag"] != detail_etag
+    finally:
+        app.dependency_overrides.pop(get_chat_service, None)
+        engine.dispose()
+
+
 def test_provider_thread_state_upsert_route():
     stub = SuccessfulStubLLM()
     app.dependency_overrides[get_chat_service] = lambda: stub
@@ -522,6 +661,35 @@ def test_provider_attachments_persisted_and_returned():
         engine.dispose()
 
 
+def test_oversized_attachment_rejected_before_decoding(monkeypatch):
+    stub = SuccessfulStubLLM()
+    app.dependency_overrides[get_chat_service] = lambda: stub
+    monkeypatch.setattr(get_settings(), "attachments_max_upload_bytes", 8)
+    try:
+        with TestClient(app) as client:
+            user = authenticate_client(client)
+            thread_resp = client.post("/api/threads", json={"title": "Upload"})
+            thread_id = thread_resp.json()["id"]
+            message_payload = {
+                "text": "Here is a file",
+                "user_id": str(user.id),
+                "model": "stub-model",
+                "attachments": [
+                    {
+                        "filename": "notes.txt",
+                        "content_type": "text/plain",
+                        "data_base64": "QUJDREVGR0hJSktMTU5PUA==",
+                    }
+                ],
+            }
+            message_resp = client.post(f"/api/threads/{thread_id}/messages", json=message_payload)
+            assert message_resp.status_code == 413
+            assert stub.calls == 0
+    finally:
+        app.dependency_overrides.pop(get_chat_service, None)
+        engine.dispose()
+
+
 def test_conversation_id_reused_between_messages():
     stub = SuccessfulStubLLM()
     recorded_conversation_ids: list[str | None] = []
@@ -557,6 +725,51 @@ def test_conversation_id_reused_between_messages():
         engine.dispose()
 
 
+def test_incremental_prompt_sends_only_new_message(monkeypatch):
+    stub = SuccessfulStubLLM()
+    recorded_prompts: list[list[str]] = []
+
+    original_create_completion = stub.create_completion
+
+    async def tracking_completion(**kwargs):
+        recorded_prompts.append([message.parts[0]["text"] for message in kwargs["messages"]])
+        return await original_create_completion(**kwargs)
+
+    stub.create_completion = tracking_completion  # type: ignore[assignment]
+    app.dependency_overrides[get_chat_service] = lambda: stub
+    monkeypatch.setattr(get_settings(), "llm_incremental_prompts", True)
+
+    try:
+        with TestClient(app) as client:
+            user = authenticate_client(client)
+            thread_id = client.post("/api/threads", json={"title": "Incremental"}).json()["id"]
+            for text in ("First", "Second"):
+                message_payload = {"text": text, "user_id": str(user.id), "model": "stub-model"}
+                assert client.post(f"/api/threads/{thread_id}/messages", json=message_payload).status_code == 201
+
+            assert recorded_prompts[0] == ["First"]
+            assert recorded_prompts[1] == ["Second"]
+
+            # A message the provider never saw forces a full replay.
+            with Session(engine) as db:
+                db.add(
+                    Message(
+                        thread_id=UUID(thread_id),
+                        sender_id=str(user.id),
+                        sender_type=SenderType.USER,
+                        text="Side note",
+                    )
+                )
+                db.commit()
+            message_payload = {"text": "Third", "user_id": str(user.id), "model": "stub-model"}
+            assert client.post(f"/api/threads/{thread_id}/messages", json=message_payload).status_code == 201
+            assert recorded_prompts[2][-2:] == ["Side note", "Third"]
+            assert len(recorded_prompts[2]) == 6
+    finally:
+        app.dependency_overrides.pop(get_chat_service, None)
+        engine.dispose()
+
+
 def test_interrupt_metadata_persisted_and_exposed():
     stub = InterruptStubLLM()
     search_stub = StubSearchIndex()
@@ -651,6 +864,71 @@ def test_search_threads_filters_by_phrase_and_model():
         engine.dispose()
 
 
+def test_search_fallback_matches_message_text_case_insensitively():
+    stub = SuccessfulStubLLM()
+    search_stub = StubSearchIndex()
+    app.dependency_overrides[get_chat_service] = lambda: stub
+    app.dependency_overrides[get_search_index_service] = lambda: search_stub
+    app.dependency_overrides[get_optional_search_index_service] = lambda: search_stub
+    try:
+        with TestClient(app) as client:
+            user = authenticate_client(client)
+            create_resp = client.post("/api/threads", json={})
+            thread_id = create_resp.json()["id"]
+            # The first message names the thread; only the second one carries the phrase.
+            for text in ("Kickoff", "Hello World"):
+                message_payload = {"text": text, "user_id": str(user.id), "model": "stub-model"}
+                client.post(f"/api/threads/{thread_id}/messages", json=message_payload)
+
+            # The stub index only does substring matches, so a regex phrase reaches the SQL fallback.
+            search_resp = client.post("/api/search/threads", json={"phrase": "hel+o wor"})
+            assert search_resp.status_code == 200
+            results = search_resp.json()
+            assert results["pagination"]["total"] == 1
+            assert results["items"][0]["thread"]["id"] == thread_id
+    finally:
+        app.dependency_overrides.pop(get_search_index_service, None)
+        app.dependency_overrides.pop(get_optional_search_index_service, None)
+        app.dependency_overrides.pop(get_chat_service, None)
+        engine.dispose()
+
+
+def test_regex_fallback_limits_case_insensitive_message_matches():
+    stub = SuccessfulStubLLM()
+    app.dependency_overrides[get_chat_service] = lambda: stub
+    try:
+        with TestClient(app) as client:
+            user = authenticate_client(client)
+            thread_ids: list[str] = []
+            for _ in range(2):
+                thread_id = client.post("/api/threads", json={}).json()["id"]
+                for text in ("Kickoff", "Hello World"):
+                    message_payload = {"text": text, "user_id": str(user.id), "model": "stub-model"}
+                    client.post(f"/api/threads/{thread_id}/messages", json=message_payload)
+                thread_ids.append(thread_id)
+
+        with Session(engine) as db:
+            newest_only = _regex_fallback(
+                session=db,
+                user_id=str(user.id),
+                pattern=_compile_pattern("hello world"),
+                model_filter=None,
+                limit=1,
+            )
+            both = _regex_fallback(
+                session=db,
+                user_id=str(user.id),
+                pattern=_compile_pattern("hello world"),
+                model_filter=None,
+                limit=10,
+            )
+        assert [str(thread_id) for thread_id in newest_only] == [thread_ids[-1]]
+        assert {str(thread_id) for thread_id in both} == set(thread_ids)
+    finally:
+        app.dependency_overrides.pop(get_chat_service, None)
+        engine.dispose()
+
+
 def test_delete_thread_marks_as_deleted():
     stub = SuccessfulStubLLM()
     search_stub = StubSearchIndex()
@@ -696,5 +974,53 @@ def test_download_attachment_endpoint_serves_files():
             assert response.content == file_contents
             disposition = response.headers.get("content-disposition", "")
             assert filename in disposition
+
+            etag = response.headers.get("etag")
+            assert etag
+            cached_response = client.get(f"/api/attachments/{filename}", headers={"If-None-Match": etag})
+            assert cached_response.status_code == 304
+            assert cached_response.content == b""
     finally:
         file_path.unlink(missing_ok=True)
+
+
+def test_stream_closed_without_reading_stops_worker():
+    stub = EndlessStubLLM()
+    with TestClient(app) as client:
+        user = authenticate_client(client)
+        create_resp = client.post("/api/threads", json={"title": "Abandoned"})
+        assert create_resp.status_code == 201, create_resp.text
+        thread_id = UUID(create_resp.json()["id"])
+
+    current_user = AuthenticatedUser(id=user.id, username=user.username, roles=("admin",))
+    payload = MessageCreate(text="Ping", sender_id=str(user.id), model="stub-model")
+
+    async def open_and_abandon():
+        with Session(engine, expire_on_commit=False) as session:
+            response = await stream_message(
+                thread_id=thread_id,
+                payload=payload,
+                background_tasks=BackgroundTasks(),
+                session=session,
+                current_user=current_user,
+                chat_service=stub,
+                search_index=None,
+            )
+            body = response.body_iterator
+            await body.__anext__()
+            await body.__anext__()
+            # The client stops reading while the agent keeps producing frames.
+            await asyncio.wait_for(stub.streaming.wait(), timeout=5)
+            await body.aclose()
+
+    try:
+        asyncio.run(open_and_abandon())
+        assert stub.cancelled
+
+        with Session(engine) as db:
+            stored = db.exec(select(Message).where(Message.thread_id == thread_id)).all()
+        assert len(stored) == 1
+        assert stored[0].status == MessageStatus.ERROR
+        assert stored[0].error_code == "Stream aborted by client"
+    finally:
+        engine.dispose()
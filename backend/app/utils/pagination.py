@@ -12,8 +12,18 @@ def clamp_limit(limit: int | None) -> int:
     return min(limit, paging_defaults.max_limit)
 
 
-def build_pagination(page: int, limit: int, total: int) -> Pagination:
-    page = max(page, 1)
-    pages = ceil(total / limit) if limit else 0
-    has_more = page < pages
-    return Pagination(total=total, page=page, limit=limit, has_more=has_more)
+def build_pagination(
+    page: int | None,
+    limit: int,
+    total: int,
+    *,
+    has_more: bool | None = None,
+    next_cursor: str | None = None,
+) -> Pagination:
+    # Cursor pages pass ``page=None``: position comes from ``next_cursor`` instead.
+    if page is not None:
+        page = max(page, 1)
+    if has_more is None:
+        pages = ceil(total / limit) if limit else 0
+        has_more = (page or 1) < pages
+    return Pagination(total=total, page=page, limit=limit, has_more=has_more, next_cursor=next_cursor)
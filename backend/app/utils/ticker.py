@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+Callback = Callable[[], None]
+
+
+class SharedTicker:
+    """One timer task per event loop that calls every subscriber each interval.
+
+    Subscribers are plain callbacks; the task starts with the first subscriber and
+    exits once none are left, so idle processes keep no timer alive.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._callbacks: set[Callback] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    def subscribe(self, callback: Callback) -> None:
+        self._callbacks.add(callback)
+        task = self._task
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def unsubscribe(self, callback: Callback) -> None:
+        self._callbacks.discard(callback)
+
+    async def _run(self) -> None:
+        while self._callbacks:
+            await asyncio.sleep(self._interval)
+            for callback in tuple(self._callbacks):
+                callback()
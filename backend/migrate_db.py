@@ -140,6 +140,28 @@ def migration_002_message_metadata(conn: Connection) -> None:
     _ensure_column(conn, "messages", "metadata", "JSON NOT NULL DEFAULT '{}'")
 
 
+def migration_003_user_lookup_indexes(conn: Connection) -> None:
+    # Registration and login probe users by username/email; make sure databases
+    # created before the model declared these indexes get them too.
+    conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username)")
+    conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)")
+
+
+def migration_004_message_thread_created_index(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_messages_thread_id_created_at ON messages (thread_id, created_at)"
+    )
+
+
+def migration_005_thread_owner_active_index(conn: Connection) -> None:
+    predicates = {"sqlite": "is_deleted IS 0", "postgresql": "is_deleted IS false"}
+    where = predicates.get(conn.dialect.name)
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_threads_owner_active_created_at ON threads (owner_id, created_at)"
+        + (f" WHERE {where}" if where else "")
+    )
+
+
 MIGRATIONS: list[Migration] = [
     Migration(
         id="001_message_attachment_links",
@@ -151,6 +173,21 @@ MIGRATIONS: list[Migration] = [
         description="Add metadata column to messages for provider data",
         apply=migration_002_message_metadata,
     ),
+    Migration(
+        id="003_user_lookup_indexes",
+        description="Ensure unique indexes on users.username and users.email",
+        apply=migration_003_user_lookup_indexes,
+    ),
+    Migration(
+        id="004_message_thread_created_index",
+        description="Add composite index on messages (thread_id, created_at)",
+        apply=migration_004_message_thread_created_index,
+    ),
+    Migration(
+        id="005_thread_owner_active_index",
+        description="Add partial index on threads (owner_id, created_at) for live threads",
+        apply=migration_005_thread_owner_active_index,
+    ),
 ]
 
 
@@ -4,7 +4,7 @@ export type MessageStatus = 'queued' | 'processing' | 'ready' | 'error'
 
 export interface Pagination {
     total: number
-    page: number
+    page: number | null
     limit: number
     has_more: boolean
 }